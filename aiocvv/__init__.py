@@ -9,6 +9,7 @@ from .dataclasses import *
 from .me import Me
 from .client import ClassevivaClient
 from .client import ClassevivaClient as Client  # pylint: disable=reimported
+from .pool import ClientPool
 
 __version__ = "0.1.1"
 __author__ = "Vinche.zsh"
@@ -3,19 +3,141 @@ This is responsible for handling the authentication of the client.
 It is used internally by the client and should not be used directly.
 """
 
+import time
+import asyncio
 from urllib.parse import urljoin
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Optional, Dict, Tuple
 
 import bcrypt
 
-from aiohttp import ClientSession, ClientResponseError
+from aiohttp import ClientResponseError
 from .errors import AuthenticationError, MultiIdentFound
 from .modules.core import Module
 from .core import CLIENT_USER_AGENT, CLIENT_DEV_APIKEY, CLIENT_CONTENT_TP
 from .utils import find_exc
 
 
+class TokenStore:
+    """
+    Keeps the tokens of the logged in identities in memory,
+    so that a valid token can be found without any I/O.
+    """
+
+    def __init__(self):
+        self.__tokens: Dict[str, Tuple[datetime, dict]] = {}
+        self.__statuses: Dict[str, Tuple[datetime, dict]] = {}
+        self.__hashes: Dict[Tuple[str, bytes], str] = {}
+        self.__locks: Dict[str, asyncio.Lock] = {}
+
+    @staticmethod
+    def key(base_url: str, username: str, identity: Optional[str] = None) -> str:
+        """
+        Get the key of an identity in the store.
+
+        :param base_url: The base URL the token is valid for.
+        :param username: The username the token has been requested with.
+        :param identity: Optional. The identity the token has been requested for.
+        :return: The key.
+        """
+        return f"{base_url}:{username}:{identity or ''}"
+
+    def get(self, key: str) -> Optional[dict]:
+        """
+        Get the token of an identity, if it hasn't expired yet.
+
+        :param key: The key of the identity, see :meth:`key`.
+        :return: The response from the Classeviva API containing the token, if any.
+        """
+        this = self.__tokens.get(key)
+        if this is not None and this[0] > datetime.now(timezone.utc):
+            return this[1]
+
+        return None
+
+    def set(self, key: str, login: dict):
+        """
+        Store the token of an identity.
+
+        :param key: The key of the identity, see :meth:`key`.
+        :param login: The response from the Classeviva API containing the token.
+        """
+        self.__tokens[key] = (datetime.fromisoformat(login["expire"]), login)
+
+    def get_status(self, token: str) -> Optional[dict]:
+        """
+        Get the status of a token, if the token hasn't expired yet.
+
+        :param token: The token.
+        :return: The status of the token from the Classeviva API, if any.
+        """
+        this = self.__statuses.get(token)
+        if this is None:
+            return None
+
+        if this[0] > datetime.now(timezone.utc):
+            return this[1]
+
+        del self.__statuses[token]
+        return None
+
+    def set_status(self, token: str, status: dict):
+        """
+        Store the status of a token, until the token expires.
+
+        :param token: The token.
+        :param status: The status of the token from the Classeviva API.
+        """
+        self.__statuses[token] = (datetime.fromisoformat(status["expire"]), status)
+
+    def get_hash(self, key: str, salt: bytes) -> Optional[str]:
+        """
+        Get the hashed password the token of an identity is kept on disk under.
+
+        :param key: The key of the identity, see :meth:`key`.
+        :param salt: The salt the password has been hashed with.
+        :return: The hashed password, if it's been hashed already.
+        """
+        return self.__hashes.get((key, salt))
+
+    def set_hash(self, key: str, salt: bytes, hashed: str):
+        """
+        Store the hashed password the token of an identity is kept on disk under,
+        so that it's hashed only once, since bcrypt is slow on purpose.
+
+        :param key: The key of the identity, see :meth:`key`.
+        :param salt: The salt the password has been hashed with.
+        :param hashed: The hashed password.
+        """
+        self.__hashes[(key, salt)] = hashed
+
+    def lock(self, key: str) -> asyncio.Lock:
+        """
+        Get the lock that must be held while refreshing the token of an identity,
+        so that only one login is made at a time for each identity.
+
+        :param key: The key of the identity, see :meth:`key`.
+        :return: The lock.
+        """
+        if key not in self.__locks:
+            self.__locks[key] = asyncio.Lock()
+
+        return self.__locks[key]
+
+    def invalidate(self, key: str, token: Optional[str] = None):
+        """
+        Forget the token of an identity, so that a new one will be requested.
+
+        :param key: The key of the identity, see :meth:`key`.
+        :param token: Optional. Forget it only if it's this one, so that
+                      a token that's already been replaced is kept.
+        """
+        this = self.__tokens.get(key)
+        if this is not None and (token is None or this[1]["token"] == token):
+            del self.__tokens[key]
+            self.__statuses.pop(this[1]["token"], None)
+
+
 class AuthenticationModule(Module):
     """
     This module is responsible for handling the authentication of the client.
@@ -23,6 +145,33 @@ class AuthenticationModule(Module):
 
     endpoint = "auth"
 
+    async def __lookup(
+        self, key: str, username: str, password: str, identity: Optional[str]
+    ) -> Tuple[str, Optional[dict]]:
+        base = self.client.base_url
+        cache = self.get_cache()
+        # add() is atomic, so concurrent clients end up using the same salt
+        await cache.add(f"salt:{base}", bcrypt.gensalt())
+        salt = await cache.get(f"salt:{base}")
+
+        # it's hashed once for every client (or pool) sharing the same tokens
+        tokens: TokenStore = self.client._tokens  # pylint: disable=protected-access
+        hashed_pw = tokens.get_hash(key, salt)
+        if hashed_pw is None:
+            # hash the password to cache it, in a thread since bcrypt is slow on purpose
+            hashed_pw = (
+                await self.client.loop.run_in_executor(
+                    None, bcrypt.hashpw, password.encode(), salt
+                )
+            ).decode()
+            tokens.set_hash(key, salt, hashed_pw)
+
+        cache_key = f"logins:{base}:{username}:{hashed_pw}"
+        if identity:
+            cache_key += f":{identity}"
+
+        return cache_key, await cache.get(cache_key)
+
     async def login(
         self, username: str, password: str, identity: Optional[str] = None
     ) -> dict:
@@ -37,88 +186,129 @@ class AuthenticationModule(Module):
         of requesting a new one. Otherwise, this function will request a new
         one, and cache it again for future requests.
 
+        The token is kept in memory by the client, so only the first call
+        looks for it in the on-disk cache. When it expires, only one login
+        is made for each identity, which every concurrent caller waits for.
+
         :param username: The user's username, or email or badge to authenticate with.
         :param password: The user's password.
         :param identity: The user's identity, in case multiple are found.
         :return: The direct response from the Classeviva API containing the token.
         """
-        with self.get_cache() as cache_:
-            if self.client.base_url not in cache_:
-                cache_[self.client.base_url] = {}
+        base = self.client.base_url
+        tokens: TokenStore = self.client._tokens  # pylint: disable=protected-access
+        key = tokens.key(base, username, identity)
+        this = tokens.get(key)
+        if this is not None:
+            return this
 
-            cache = cache_[self.client.base_url]
+        async with tokens.lock(key):
+            # the token might have been refreshed while waiting for the lock
+            this = tokens.get(key)
+            if this is not None:
+                return this
 
-            try:
-                if "salt" not in cache:
-                    cache["salt"] = bcrypt.gensalt()
+            return await self.__refresh(key, username, password, identity)
 
-                # hash the password to cache it
-                hashed_pw = bcrypt.hashpw(password.encode(), cache["salt"]).decode()
-                if "logins" not in cache:
-                    cache["logins"] = {}
+    async def invalidate(
+        self, username: str, password: str, identity: Optional[str], token: str
+    ):
+        """
+        Forget a token the server doesn't accept anymore, even if it hasn't
+        expired yet, both in memory and on disk, so that the next login
+        requests a new one.
 
-                cache_key = f"{username}:{hashed_pw}"
-                login_cache = cache["logins"]
-                if identity:
-                    cache_key += f":{identity}"
+        :param username: The user's username, or email or badge to authenticate with.
+        :param password: The user's password.
+        :param identity: The user's identity, in case multiple are found.
+        :param token: The token that's not accepted.
+        """
+        tokens: TokenStore = self.client._tokens  # pylint: disable=protected-access
+        key = tokens.key(self.client.base_url, username, identity)
+        tokens.invalidate(key, token)
+        if self.client.persist_tokens:
+            persistent_key, this = await self.__lookup(
+                key, username, password, identity
+            )
+            if this is not None and this.get("token") == token:
+                await self.get_cache().delete(persistent_key)
+
+    async def __refresh(
+        self, key: str, username: str, password: str, identity: Optional[str]
+    ) -> dict:
+        tokens: TokenStore = self.client._tokens  # pylint: disable=protected-access
+        persist = self.client.persist_tokens
+        if persist:
+            persistent_key, this = await self.__lookup(
+                key, username, password, identity
+            )
+
+            # check in the cache for the token and its expiration
+            if this is not None:
+                tokens.set(key, this)
+                if tokens.get(key) is not None:
+                    self.client.metrics.record_login("restored")
+                    return this
+
+        req = {"uid": username, "pass": password}
+        if identity:
+            req["ident"] = identity
+
+        # do the actual request to get the token, if expired or not found
+        started = time.perf_counter()
+        try:
+            content = await self.__request_token(req, identity)
+        except BaseException:
+            self.client.metrics.record_login("failed", time.perf_counter() - started)
+            raise
+
+        self.client.metrics.record_login("succeeded", time.perf_counter() - started)
 
-                # check in the cache for the token and its expiration
-                if cache_key in login_cache:
-                    this = login_cache[cache_key]
-                    expires_at = datetime.fromisoformat(this["expire"])
-                    if expires_at > datetime.now(timezone.utc):
-                        return this
+        # cache response, will be re-cached as soon as the token expires
+        tokens.set(key, content)
+        if persist:
+            await self.get_cache().set(persistent_key, content)
 
-                req = {"uid": username, "pass": password}
+        return content
+
+    async def __request_token(self, req: dict, identity: Optional[str]) -> dict:
+        async with self.client._connect(  # pylint: disable=protected-access
+            "POST",
+            urljoin(self.client.base_url, "auth/login"),
+            headers={
+                "User-Agent": CLIENT_USER_AGENT,
+                "Z-Dev-Apikey": CLIENT_DEV_APIKEY,
+                "Content-Type": CLIENT_CONTENT_TP,
+            },
+            json=req,
+        ) as resp:
+            content = await resp.json(loads=self.client.json_loads)
+            if resp.status == 422:
+                msg = {
+                    "content": content,
+                    "status": resp.status,
+                    "status_reason": resp.reason,
+                }
+                raise find_exc(msg, AuthenticationError)
+
+            if "choices" in content and (
+                not identity or identity not in [c["ident"] for c in content["choices"]]
+            ):
+                choices = " * " + "\n * ".join(
+                    f"{c['ident']} ({c['name']})" for c in content["choices"]
+                )
+                msg = "Multiple identities have been found, but none has been specified"
                 if identity:
-                    req["ident"] = identity
-
-                # do the actual request to get the token, if expired or not found
-                async with ClientSession(loop=self.client.loop) as session:
-                    async with session.post(
-                        urljoin(self.client.base_url, "auth/login"),
-                        headers={
-                            "User-Agent": CLIENT_USER_AGENT,
-                            "Z-Dev-Apikey": CLIENT_DEV_APIKEY,
-                            "Content-Type": CLIENT_CONTENT_TP,
-                        },
-                        json=req,
-                    ) as resp:
-                        content = await resp.json()
-                        if resp.status == 422:
-                            msg = {
-                                "content": content,
-                                "status": resp.status,
-                                "status_reason": resp.reason,
-                            }
-                            raise find_exc(msg, AuthenticationError)
-
-                        if "choices" in content and (
-                            not identity
-                            or identity not in [c["ident"] for c in content["choices"]]
-                        ):
-                            choices = " * " + "\n * ".join(
-                                f"{c['ident']} ({c['name']})"
-                                for c in content["choices"]
-                            )
-                            msg = "Multiple identities have been found, but none has been specified"
-                            if identity:
-                                msg = "Could not find the requested identity"
-
-                            raise MultiIdentFound(
-                                f"{msg}. Possible choices are:\n{choices}"
-                            )
-
-                        try:
-                            resp.raise_for_status()
-                        except ClientResponseError as e:
-                            raise AuthenticationError(content) from e
-
-                        # cache response, will be re-cached as soon as the token expires
-                        login_cache[cache_key] = content
-                        return content
-            finally:
-                cache_[self.client.base_url] = cache
+                    msg = "Could not find the requested identity"
+
+                raise MultiIdentFound(f"{msg}. Possible choices are:\n{choices}")
+
+            try:
+                resp.raise_for_status()
+            except ClientResponseError as e:
+                raise AuthenticationError(content) from e
+
+        return content
 
     async def status(self, token: str) -> dict:
         """
@@ -128,34 +318,25 @@ class AuthenticationModule(Module):
         :param token: The token to check the status of.
         :return: The direct response from the Classeviva API.
         """
-        with self.get_cache() as cache_:
-            if self.client.base_url not in cache_:
-                cache_[self.client.base_url] = {}
+        # the statuses are kept with the tokens, so that
+        # they're shared between pooled clients
+        tokens: TokenStore = self.client._tokens  # pylint: disable=protected-access
+        this = tokens.get_status(token)
+        if this is not None:
+            return this
 
-            cache = cache_[self.client.base_url]
-            try:
-                if "logins_status" not in cache:
-                    cache["logins_status"] = {}
-
-                status = cache["logins_status"]
-                if token in status:
-                    this = status[token]
-                    expires_at = datetime.fromisoformat(this["expire"])
-                    if expires_at > datetime.now(timezone.utc):
-                        return this
-
-                async with ClientSession(loop=self.client.loop) as session:
-                    async with session.get(
-                        urljoin(self.client.base_url, "auth/status"),
-                        headers={
-                            "User-Agent": CLIENT_USER_AGENT,
-                            "Z-Dev-Apikey": CLIENT_DEV_APIKEY,
-                            "Content-Type": CLIENT_CONTENT_TP,
-                            "Z-Auth-Token": token,
-                        },
-                    ) as resp:
-                        resp.raise_for_status()
-                        status[token] = (await resp.json())["status"]
-                        return status[token]
-            finally:
-                cache_[self.client.base_url] = cache
+        async with self.client._connect(  # pylint: disable=protected-access
+            "GET",
+            urljoin(self.client.base_url, "auth/status"),
+            headers={
+                "User-Agent": CLIENT_USER_AGENT,
+                "Z-Dev-Apikey": CLIENT_DEV_APIKEY,
+                "Content-Type": CLIENT_CONTENT_TP,
+                "Z-Auth-Token": token,
+            },
+        ) as resp:
+            resp.raise_for_status()
+            status = (await resp.json(loads=self.client.json_loads))["status"]
+
+        tokens.set_status(token, status)
+        return status
@@ -0,0 +1,293 @@
+"""
+This module contains the backends the client can store its cache in.
+
+A backend is any object implementing :class:`CacheBackend`, so the cache
+can be kept wherever it fits best, like a key-value store shared by many
+workers. The built-in ones keep it in memory, in a :class:`diskcache.Cache`
+(the default) or in a SQLite database.
+"""
+
+import io
+import os
+import asyncio
+import pickle
+import sqlite3
+import threading
+from functools import partial
+from typing import Optional, Any, Dict, Callable, Tuple, TypeVar
+
+from diskcache import Cache
+from typing_extensions import Protocol, runtime_checkable
+
+T = TypeVar("T")
+
+EVICTION_POLICIES = {
+    "lru": "least-recently-used",
+    "lfu": "least-frequently-used",
+}
+
+
+@runtime_checkable
+class CacheBackend(Protocol):
+    """
+    The protocol every cache backend must implement.
+
+    The values are any picklable object, and every method is asynchronous,
+    so that a backend doing I/O never blocks the event loop.
+    """
+
+    async def get(self, key: str) -> Optional[Any]:
+        """
+        Get a value.
+
+        :param key: The key of the value.
+        :return: The value, or None if it's not stored.
+        """
+
+    async def set(self, key: str, value: Any):
+        """
+        Store a value, replacing the one with the same key, if any.
+
+        :param key: The key of the value.
+        :param value: The value.
+        """
+
+    async def add(self, key: str, value: Any) -> bool:
+        """
+        Store a value only if there isn't one with the same key.
+        This must be atomic, since it's used to share values between clients.
+
+        :param key: The key of the value.
+        :param value: The value.
+        :return: Whether the value has been stored.
+        """
+
+    async def delete(self, key: str):
+        """
+        Delete a value, if it's stored.
+
+        :param key: The key of the value.
+        """
+
+    async def sizes(self) -> Dict[str, int]:
+        """
+        Get how many bytes each stored value takes, roughly.
+
+        :return: The size of every value, by key.
+        """
+
+    async def close(self):
+        """Release the resources of the backend. It must still work if used again."""
+
+
+class _ExecutorBackend:
+    # runs the blocking operations of a backend in the default executor
+
+    def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.loop = loop or asyncio.get_event_loop()
+
+    async def _run(self, func: Callable[..., T], *args: Any) -> T:
+        return await self.loop.run_in_executor(None, partial(func, *args))
+
+
+class MemoryBackend:
+    """
+    A backend keeping everything in a dictionary.
+    Nothing survives between runs, and nothing is ever evicted.
+    """
+
+    def __init__(self):
+        self.__data: Dict[str, Any] = {}
+
+    async def get(self, key: str) -> Optional[Any]:
+        return self.__data.get(key)
+
+    async def set(self, key: str, value: Any):
+        self.__data[key] = value
+
+    async def add(self, key: str, value: Any) -> bool:
+        if key in self.__data:
+            return False
+
+        self.__data[key] = value
+        return True
+
+    async def delete(self, key: str):
+        self.__data.pop(key, None)
+
+    async def sizes(self) -> Dict[str, int]:
+        return {
+            key: len(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+            for key, value in self.__data.items()
+        }
+
+    async def close(self):
+        pass
+
+
+class DiskCacheBackend(_ExecutorBackend):
+    """
+    A backend using a :class:`diskcache.Cache`, which is safe to share
+    between processes. This is the default one.
+
+    :param path: The directory of the cache.
+    :param size_limit: Optional. The maximum size of the cache, in bytes.
+    :param eviction: Optional. Which values are evicted first when the cache is full:
+                     the least recently used ones (``lru``) or the least
+                     frequently used ones (``lfu``).
+    :param loop: Optional. The event loop to run the disk operations from.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        size_limit: int = 2**30,
+        eviction: str = "lru",
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+    ):
+        if eviction not in EVICTION_POLICIES:
+            raise ValueError(
+                f"eviction must be one of {', '.join(EVICTION_POLICIES)}, not {eviction!r}"
+            )
+
+        super().__init__(loop)
+        self.path = path
+        self.size_limit = size_limit
+        self.eviction = eviction
+        self.__cache: Optional[Cache] = None
+        self.__lock = threading.Lock()
+
+    def __open(self) -> Cache:
+        with self.__lock:
+            if self.__cache is None:
+                self.__cache = Cache(
+                    self.path,
+                    size_limit=self.size_limit,
+                    eviction_policy=EVICTION_POLICIES[self.eviction],
+                )
+
+            return self.__cache
+
+    async def get(self, key: str) -> Optional[Any]:
+        return await self._run(lambda: self.__open().get(key))
+
+    async def set(self, key: str, value: Any):
+        await self._run(lambda: self.__open().set(key, value))
+
+    async def add(self, key: str, value: Any) -> bool:
+        return await self._run(lambda: self.__open().add(key, value))
+
+    async def delete(self, key: str):
+        await self._run(lambda: self.__open().delete(key))
+
+    @staticmethod
+    def __read_sizes(cache: Cache) -> Dict[str, int]:
+        # only through the public API, but every value is read and, with
+        # the lru and lfu policies, counted as used
+        sizes = {}
+        for key in cache.iterkeys():
+            value = cache.get(key, read=True)
+            if value is None:
+                continue
+
+            if isinstance(value, io.BufferedReader):
+                # the values larger than disk_min_file_size are stored in files
+                with value:
+                    sizes[str(key)] = os.fstat(value.fileno()).st_size
+            else:
+                sizes[str(key)] = len(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+
+        return sizes
+
+    def __sizes(self) -> Dict[str, int]:
+        cache = self.__open()
+        try:
+            # diskcache has no public way to get the sizes without reading
+            # the values, so its table (as of diskcache 5, which setup.py
+            # pins) is queried, falling back to reading them if it changes
+            rows = cache._sql(  # pylint: disable=protected-access
+                "SELECT key, size + COALESCE(LENGTH(value), 0) FROM Cache"
+            ).fetchall()
+        except (AttributeError, sqlite3.Error):
+            return self.__read_sizes(cache)
+
+        return {str(key): size for key, size in rows}
+
+    async def sizes(self) -> Dict[str, int]:
+        return await self._run(self.__sizes)
+
+    async def close(self):
+        if self.__cache is not None:
+            cache, self.__cache = self.__cache, None
+            await self._run(cache.close)
+
+
+class SQLiteBackend(_ExecutorBackend):
+    """
+    A backend storing the pickled values in a single SQLite table.
+
+    :param path: The path of the database file.
+    :param loop: Optional. The event loop to run the database operations from.
+    """
+
+    def __init__(self, path: str, *, loop: Optional[asyncio.AbstractEventLoop] = None):
+        super().__init__(loop)
+        self.path = path
+        self.__conn: Optional[sqlite3.Connection] = None
+        self.__lock = threading.Lock()
+
+    def __execute(self, query: str, *params: Any) -> Tuple[list, int]:
+        with self.__lock:
+            if self.__conn is None:
+                self.__conn = sqlite3.connect(
+                    self.path, check_same_thread=False, isolation_level=None
+                )
+                self.__conn.execute(
+                    "CREATE TABLE IF NOT EXISTS cache "
+                    "(key TEXT PRIMARY KEY, value BLOB NOT NULL)"
+                )
+
+            cursor = self.__conn.execute(query, params)
+            return cursor.fetchall(), cursor.rowcount
+
+    async def get(self, key: str) -> Optional[Any]:
+        rows, _ = await self._run(
+            self.__execute, "SELECT value FROM cache WHERE key = ?", key
+        )
+        return pickle.loads(rows[0][0]) if rows else None
+
+    async def set(self, key: str, value: Any):
+        await self._run(
+            self.__execute,
+            "INSERT OR REPLACE INTO cache (key, value) VALUES (?, ?)",
+            key,
+            pickle.dumps(value, pickle.HIGHEST_PROTOCOL),
+        )
+
+    async def add(self, key: str, value: Any) -> bool:
+        _, added = await self._run(
+            self.__execute,
+            "INSERT OR IGNORE INTO cache (key, value) VALUES (?, ?)",
+            key,
+            pickle.dumps(value, pickle.HIGHEST_PROTOCOL),
+        )
+        return added > 0
+
+    async def delete(self, key: str):
+        await self._run(self.__execute, "DELETE FROM cache WHERE key = ?", key)
+
+    async def sizes(self) -> Dict[str, int]:
+        rows, _ = await self._run(
+            self.__execute, "SELECT key, LENGTH(value) FROM cache"
+        )
+        return dict(rows)
+
+    def __close(self):
+        with self.__lock:
+            if self.__conn is not None:
+                conn, self.__conn = self.__conn, None
+                conn.close()
+
+    async def close(self):
+        await self._run(self.__close)
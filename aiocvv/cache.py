@@ -0,0 +1,248 @@
+"""
+This module contains the cache used to store the responses from the Classeviva API.
+It is used internally by the client and should not be used directly.
+"""
+
+import pickle
+from collections import OrderedDict
+from typing import Optional, Mapping, Any, Dict
+from urllib.parse import urlsplit, urlencode, parse_qsl
+
+from .types import Response
+from .backends import CacheBackend, EVICTION_POLICIES
+
+
+def request_key(method: str, url: str, params: Any = None) -> str:
+    """
+    Build the cache key of a request.
+
+    The key is made of the method, the full URL (so it includes the base URL)
+    and the query parameters, sorted so that their order doesn't matter.
+
+    :param method: The HTTP method of the request.
+    :param url: The absolute URL of the request.
+    :param params: Optional. The query parameters of the request.
+    :return: The cache key.
+    """
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    if isinstance(params, Mapping):
+        query += list(params.items())
+    elif isinstance(params, str):
+        query += parse_qsl(params, keep_blank_values=True)
+    elif params:
+        query += list(params)
+
+    key = f"requests:{method.upper()} {parts.scheme}://{parts.netloc}{parts.path}"
+    if query:
+        key += "?" + urlencode(sorted((str(k), str(v)) for k, v in query))
+
+    return key
+
+
+def endpoint_family(key: str) -> str:
+    """
+    Get the family of the endpoint a cache key belongs to, which is what
+    the cache usage is grouped by.
+
+    For the responses, it's the endpoints around the ID in their path, like
+    ``students/grades2`` or ``students/noticeboard``. For anything else
+    stored in the cache, like the tokens, it's the prefix of the key.
+
+    :param key: The cache key, see :func:`request_key`.
+    :return: The family.
+    """
+    prefix, _, rest = key.partition(":")
+    if prefix != "requests":
+        return prefix
+
+    segments = [s for s in urlsplit(rest.partition(" ")[2]).path.split("/") if s]
+    for i, segment in enumerate(segments):
+        if segment.isdigit():
+            return "/".join(segments[max(i - 1, 0) : i] + segments[i + 1 : i + 2])
+
+    return "/".join(segments[-2:])
+
+
+def sizeof(value: Any) -> int:
+    """
+    Get roughly how many bytes a cached value takes.
+    For the responses, that's the size of their raw body.
+
+    :param value: The cached value.
+    :return: The size in bytes.
+    """
+    if isinstance(value, Response):
+        return len(value.body)
+
+    return len(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+
+
+class ResponseCache:
+    """
+    A two-level cache for the responses of the Classeviva API.
+
+    The first level lives in memory and is bounded, so that fresh responses are
+    returned without any I/O. The second level is a :class:`~aiocvv.backends.CacheBackend`,
+    which is written through on every update so that the responses survive
+    between runs (or are shared between workers, depending on the backend).
+
+    The first level evicts either the least recently used (``lru``) or the
+    least frequently used (``lfu``) responses first. See :meth:`usage` for
+    how much space the two levels take.
+
+    :param backend: The backend of the second level.
+    :param maxsize: Optional. The maximum number of responses kept in memory.
+    :param max_bytes: Optional. The maximum size of the responses kept in memory,
+                      in bytes. None means only ``maxsize`` is respected.
+    :param eviction: Optional. The eviction policy, either ``lru`` or ``lfu``.
+    """
+
+    def __init__(
+        self,
+        backend: CacheBackend,
+        *,
+        maxsize: int = 512,
+        max_bytes: Optional[int] = None,
+        eviction: str = "lru",
+    ):
+        if eviction not in EVICTION_POLICIES:
+            raise ValueError(
+                f"eviction must be one of {', '.join(EVICTION_POLICIES)}, not {eviction!r}"
+            )
+
+        if maxsize < 0:
+            raise ValueError("maxsize cannot be negative")
+
+        self.backend = backend
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.eviction = eviction
+        self.__memory: "OrderedDict[str, Response]" = OrderedDict()
+        self.__sizes: Dict[str, int] = {}
+        self.__uses: Dict[str, int] = {}
+        self.__bytes = 0
+
+    def __use(self, key: str):
+        self.__memory.move_to_end(key)
+        self.__uses[key] += 1
+
+    def __forget(self, key: str):
+        del self.__memory[key]
+        self.__bytes -= self.__sizes.pop(key)
+        del self.__uses[key]
+
+    def __remember(self, key: str, value: Response):
+        if key in self.__memory:
+            self.__forget(key)
+
+        size = sizeof(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            # too big to be kept in memory, it will be read from the backend
+            return
+
+        self.__memory[key] = value
+        self.__sizes[key] = size
+        self.__uses[key] = 1
+        self.__bytes += size
+        while len(self.__memory) > self.maxsize or (
+            self.max_bytes is not None and self.__bytes > self.max_bytes
+        ):
+            if self.eviction == "lfu" and len(self.__memory) > 1:
+                # the least used one, and the oldest among them, but never the new one
+                victim = min(
+                    (k for k in self.__memory if k != key),
+                    key=self.__uses.__getitem__,
+                )
+            else:
+                # with lfu, this is only reached when the new one is all there is
+                victim = next(iter(self.__memory))
+
+            self.__forget(victim)
+
+    def peek(self, key: str) -> Optional[Response]:
+        """
+        Get a response from memory only, without ever touching the backend.
+
+        :param key: The key of the response, see :func:`request_key`.
+        :return: The cached response, if any.
+        """
+        value = self.__memory.get(key)
+        if value is not None:
+            self.__use(key)
+
+        return value
+
+    async def get(self, key: str) -> Optional[Response]:
+        """
+        Get a response, looking for it in memory first and then in the backend.
+
+        :param key: The key of the response, see :func:`request_key`.
+        :return: The cached response, if any.
+        """
+        value = self.peek(key)
+        if value is None:
+            value = await self.backend.get(key)
+            if value is not None:
+                self.__remember(key, value)
+
+        return value
+
+    async def set(self, key: str, value: Response):
+        """
+        Store a response both in memory and in the backend.
+
+        :param key: The key of the response, see :func:`request_key`.
+        :param value: The response to store.
+        """
+        self.__remember(key, value)
+        await self.backend.set(key, value)
+
+    def clear_memory(self):
+        """Drop every response kept in memory. The ones in the backend are kept."""
+        self.__memory.clear()
+        self.__sizes.clear()
+        self.__uses.clear()
+        self.__bytes = 0
+
+    @staticmethod
+    def __usage(sizes: Dict[str, int]) -> Dict[str, Any]:
+        families: Dict[str, int] = {}
+        for key, size in sizes.items():
+            family = endpoint_family(key)
+            families[family] = families.get(family, 0) + size
+
+        return {
+            "entries": len(sizes),
+            "bytes": sum(sizes.values()),
+            "families": families,
+        }
+
+    async def usage(self, backend: bool = True) -> Dict[str, Any]:
+        """
+        Get how much space the cache is taking, in total and by endpoint
+        family (see :func:`endpoint_family`).
+
+        In memory, only the raw bodies of the responses are counted,
+        not the objects they're decoded to.
+
+        .. code-block:: python
+
+            {
+                "memory": {"entries": 12, "bytes": 53412, "families": {"students/grades2": 51200, ...}},
+                "backend": {"entries": 40, "bytes": 1200128, "families": {...}},
+            }
+
+        :param backend: Optional. Whether to include the backend, which
+                        means reading the size of everything it holds.
+        :return: The usage of each level.
+        """
+        ret = {"memory": self.__usage(self.__sizes)}
+        if backend:
+            ret["backend"] = self.__usage(await self.backend.sizes())
+
+        return ret
+
+    async def close(self):
+        """Close the backend. It will be reopened if needed again."""
+        await self.backend.close()
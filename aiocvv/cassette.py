@@ -0,0 +1,335 @@
+"""
+This module contains the Cassette class, which records the requests made
+to the Classeviva API and replays them, so that the client can be used
+offline, for example in tests and benchmarks.
+"""
+
+import os
+import json
+import asyncio
+from base64 import b64encode, b64decode
+from datetime import datetime
+from typing import Optional, Any, Dict, AsyncIterator
+
+import aiohttp
+from multidict import CIMultiDict, CIMultiDictProxy
+from yarl import URL
+
+from .cache import request_key
+from .codec import parse_content_type
+
+MODES = ("record", "replay", "auto")
+
+# the only headers which are recorded, everything else might be sensitive
+RECORDED_HEADERS = ("Content-Type", "ETag", "Z-Cache-Control", "Date", "Retry-After")
+
+# the fields of the JSON bodies which are replaced when recording
+SCRUBBED_FIELDS = frozenset(("token", "uid", "pass"))
+SCRUBBED = "<scrubbed>"
+
+# the endpoints whose recorded tokens are made valid again when replayed
+TOKEN_ENDPOINTS = ("/auth/login", "/auth/status")
+
+
+class InteractionNotFound(LookupError):
+    """
+    A request has been made while replaying a cassette,
+    but it's not been recorded in it.
+    """
+
+
+def scrub(value: Any) -> Any:
+    """
+    Replace the tokens and the credentials in a JSON document.
+
+    :param value: The JSON document.
+    :return: The scrubbed JSON document.
+    """
+    if isinstance(value, dict):
+        return {
+            k: SCRUBBED if k in SCRUBBED_FIELDS else scrub(v) for k, v in value.items()
+        }
+
+    if isinstance(value, list):
+        return [scrub(v) for v in value]
+
+    return value
+
+
+def renew(value: Any) -> Any:
+    """
+    Move the expiry of the tokens in a JSON document forward, so that
+    they're valid from now on for as long as they were when recorded.
+
+    :param value: The JSON document.
+    :return: The JSON document with the tokens renewed.
+    """
+    if isinstance(value, dict):
+        value = {k: renew(v) for k, v in value.items()}
+        if isinstance(value.get("release"), str) and isinstance(
+            value.get("expire"), str
+        ):
+            try:
+                release = datetime.fromisoformat(value["release"])
+                expire = datetime.fromisoformat(value["expire"])
+            except ValueError:
+                return value
+
+            now = datetime.now(release.tzinfo)
+            value["release"] = now.isoformat()
+            value["expire"] = (now + (expire - release)).isoformat()
+
+        return value
+
+    if isinstance(value, list):
+        return [renew(v) for v in value]
+
+    return value
+
+
+class _Content:
+    # stands in for aiohttp.StreamReader
+    def __init__(self, body: bytes):
+        self.__body = body
+
+    async def read(self) -> bytes:
+        return self.__body
+
+    async def iter_chunked(self, n: int) -> AsyncIterator[bytes]:
+        for i in range(0, len(self.__body), n):
+            yield self.__body[i : i + n]
+
+
+class CassetteResponse:
+    """
+    A recorded response, which stands in for :class:`aiohttp.ClientResponse`.
+
+    :param method: The HTTP method of the request.
+    :param url: The URL of the request.
+    :param status: The HTTP status code.
+    :param reason: The HTTP status reason.
+    :param headers: The recorded headers.
+    :param body: The body.
+    """
+
+    def __init__(
+        self,
+        method: str,
+        url: str,
+        status: int,
+        reason: Optional[str],
+        headers: Dict[str, str],
+        body: bytes,
+    ):
+        self.method = method
+        self.url = URL(url)
+        self.status = status
+        self.reason = reason
+        self.headers = CIMultiDictProxy(CIMultiDict(headers))
+        self.content = _Content(body)
+        self.__body = body
+
+    async def read(self) -> bytes:
+        return self.__body
+
+    async def json(self, *, loads=json.loads, **_) -> Any:
+        return loads(self.__body)
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise aiohttp.ClientResponseError(
+                aiohttp.RequestInfo(
+                    self.url, self.method, CIMultiDictProxy(CIMultiDict()), self.url
+                ),
+                (),
+                status=self.status,
+                message=self.reason or "",
+                headers=self.headers,
+            )
+
+    def release(self):
+        pass
+
+
+class Cassette:
+    """
+    A file where the requests made by a client are recorded, to be replayed later.
+
+    * In ``record`` mode, every request is sent and its response is recorded;
+    * In ``replay`` mode, no request is sent, and the recorded response is
+      returned instead. If a request has not been recorded,
+      :class:`InteractionNotFound` is raised;
+    * In ``auto`` mode, the recorded responses are replayed,
+      and the requests that haven't been recorded are sent and recorded.
+
+    Only the last response of every request is kept, and the requests
+    are recorded without their conditional headers, so that the whole
+    response is always recorded. When replaying, a request with the ``ETag``
+    of the recorded response gets a ``304 Not Modified``, like it would
+    from the server.
+
+    The tokens and credentials are scrubbed from the recorded JSON bodies,
+    and only the headers the library needs are recorded. The request
+    headers and bodies are never recorded. The replayed tokens are made
+    valid from the moment they're replayed, so that old cassettes don't
+    make the client log in again on every request. They're never written
+    to the cache that live clients use, since a client which isn't only
+    recording keeps its cache and tokens in memory.
+
+    .. code-block:: python
+
+        cassette = Cassette("grades.json", "record")
+        async with ClassevivaClient("username", "password", cassette=cassette) as client:
+            await client.me.get_grades()
+        # the cassette is saved when the client is closed
+
+        cassette = Cassette("grades.json")
+        async with ClassevivaClient("username", "password", cassette=cassette) as client:
+            await client.me.get_grades()  # no request is sent
+
+    :param path: The path of the cassette file.
+    :param mode: Optional. Either ``record``, ``replay`` or ``auto``.
+    """
+
+    def __init__(self, path: str, mode: str = "replay"):
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {', '.join(MODES)}, not {mode!r}")
+
+        self.path = os.fspath(path)
+        self.mode = mode
+        self.__interactions: Optional[Dict[str, dict]] = None
+        self.__changed = False
+
+    @property
+    def recording(self) -> bool:
+        """Whether the requests that are made can be recorded."""
+        return self.mode in ("record", "auto")
+
+    def __load(self) -> Dict[str, dict]:
+        if self.mode == "record" or not os.path.exists(self.path):
+            if self.mode == "replay":
+                raise FileNotFoundError(f"No cassette found at {self.path}")
+
+            return {}
+
+        with open(self.path, "r", encoding="utf-8") as f:
+            return {i["key"]: i for i in json.load(f)["interactions"]}
+
+    async def __get_interactions(self) -> Dict[str, dict]:
+        if self.__interactions is None:
+            loop = asyncio.get_event_loop()
+            self.__interactions = await loop.run_in_executor(None, self.__load)
+
+        return self.__interactions
+
+    @staticmethod
+    def __respond(
+        method: str,
+        url: str,
+        interaction: dict,
+        body: bytes,
+        etag: Optional[str],
+    ) -> CassetteResponse:
+        headers = interaction["headers"]
+        if etag and etag == headers.get("ETag"):
+            return CassetteResponse(method, url, 304, "Not Modified", headers, b"")
+
+        return CassetteResponse(
+            method, url, interaction["status"], interaction["reason"], headers, body
+        )
+
+    @staticmethod
+    def __renew(interaction: dict, body: bytes) -> bytes:
+        # a replayed login would otherwise be expired as soon
+        # as the cassette is older than the token's lifetime
+        if interaction["encoding"] != "utf-8":
+            return body
+
+        try:
+            return json.dumps(renew(json.loads(body)), ensure_ascii=False).encode()
+        except ValueError:
+            return body
+
+    @staticmethod
+    def __record(key: str, resp: aiohttp.ClientResponse, body: bytes) -> dict:
+        headers = {k: resp.headers[k] for k in RECORDED_HEADERS if k in resp.headers}
+        mime, _ = parse_content_type(headers.get("Content-Type", ""))
+        interaction = {
+            "key": key,
+            "status": resp.status,
+            "reason": resp.reason,
+            "headers": headers,
+        }
+        try:
+            text = body.decode()
+        except UnicodeDecodeError:
+            interaction.update(encoding="base64", body=b64encode(body).decode())
+            return interaction
+
+        if mime == "application/json" or mime.endswith("+json"):
+            try:
+                text = json.dumps(scrub(json.loads(text)), ensure_ascii=False)
+            except ValueError:
+                pass
+
+        interaction.update(encoding="utf-8", body=text)
+        return interaction
+
+    async def play(
+        self, session: aiohttp.ClientSession, method: str, url: str, **kwargs
+    ) -> CassetteResponse:
+        """
+        Get the response of a request, either from the cassette or
+        by sending it, depending on the mode.
+
+        :param session: The session to send the request with, if needed.
+        :param method: The HTTP method of the request.
+        :param url: The absolute URL of the request.
+        :param kwargs: The other arguments of :meth:`aiohttp.ClientSession.request`.
+        :return: The response.
+        """
+        interactions = await self.__get_interactions()
+        key = request_key(method, url, kwargs.get("params"))
+        headers = dict(kwargs.pop("headers", None) or {})
+        etag = headers.pop("If-None-Match", None)
+        if self.mode != "record" and key in interactions:
+            interaction = interactions[key]
+            if interaction["encoding"] == "base64":
+                body = b64decode(interaction["body"])
+            else:
+                body = interaction["body"].encode()
+
+            if URL(url).path.endswith(TOKEN_ENDPOINTS):
+                body = self.__renew(interaction, body)
+
+            return self.__respond(method, url, interaction, body, etag)
+
+        if not self.recording:
+            raise InteractionNotFound(f"{key} has not been recorded in {self.path}")
+
+        # the conditional header is left out so that the whole body is recorded
+        async with session.request(
+            method, url, headers=headers, raise_for_status=False, **kwargs
+        ) as resp:
+            body = await resp.read()
+            interactions[key] = self.__record(key, resp, body)
+            self.__changed = True
+
+        # only the recording is scrubbed, the client still needs the real token
+        return self.__respond(method, url, interactions[key], body, etag)
+
+    def __save(self, interactions: Dict[str, dict]):
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"version": 1, "interactions": list(interactions.values())},
+                f,
+                ensure_ascii=False,
+                indent=1,
+            )
+
+    async def save(self):
+        """Write the recorded requests to the cassette file, if anything has been recorded."""
+        if self.__changed:
+            loop = asyncio.get_event_loop()
+            await loop.run_in_executor(None, self.__save, dict(self.__interactions))
+            self.__changed = False
@@ -1,15 +1,26 @@
 """The module where the ClassevivaClient class is located."""
 
 import os
+import time
 import asyncio
-import json
 from datetime import datetime
 from types import SimpleNamespace
-from typing import Optional, Mapping, Any, Iterable, Union, Tuple
-from urllib.parse import urljoin, urlsplit, urlparse
+from contextlib import asynccontextmanager
+from typing import (
+    Optional,
+    Mapping,
+    Any,
+    Iterable,
+    Union,
+    Tuple,
+    Dict,
+    List,
+    Awaitable,
+    AsyncIterator,
+)
+from urllib.parse import urljoin, urlsplit
 
 import aiohttp
-from diskcache import Cache
 from appdirs import user_cache_dir
 from typing_extensions import Self
 from aiohttp.client import (
@@ -29,11 +40,19 @@ from . import me
 from .errors import AuthenticationError
 from .me import UserType, Teacher, Student, Parent
 from .types import Response
-from .utils import find_exc
-from ._auth import AuthenticationModule
-
-_json = json
+from .utils import find_exc, gather_bounded
+from .codec import JSONLoads, get_loads
+from ._auth import AuthenticationModule, TokenStore
+from .cache import ResponseCache, request_key
+from .backends import CacheBackend, DiskCacheBackend, MemoryBackend
+from .cassette import Cassette
+from .metrics import Metrics
+from .ratelimit import RateLimiter, parse_retry_after
+from .retry import CircuitBreaker, IDEMPOTENT_METHODS, backoff_delay
+
+SAFE_METHODS = frozenset(("GET", "HEAD", "OPTIONS"))
 LoginMethods = Union[Tuple[str, str], Tuple[str, str, str]]
+RequestSpec = Union[str, Tuple[str, str], Mapping[str, Any]]
 
 
 class ClassevivaClient:
@@ -77,12 +96,113 @@ class ClassevivaClient:
                            Setting this to True might introduce some delays in
                            updates, but will reduce the number of requests made
                            and will make the client faster.
+    :param connector_limit: Optional. The maximum number of simultaneous
+                            connections kept in the client's pool.
+    :param connector_limit_per_host: Optional. The maximum number of simultaneous
+                                     connections to the same host. 0 means no limit.
+    :param keepalive_timeout: Optional. How many seconds an idle connection
+                              is kept open to be reused by the next requests.
+    :param dns_cache_ttl: Optional. How many seconds resolved host names are cached.
+                          None disables the DNS cache.
+    :param memory_cache_size: Optional. How many responses are kept in memory,
+                              on top of the ones cached on disk.
+    :param memory_cache_bytes: Optional. The maximum size in bytes of the responses
+                               kept in memory. None means there is no limit
+                               other than ``memory_cache_size``.
+    :param disk_cache_bytes: Optional. The maximum size in bytes of the on-disk cache.
+                             Ignored if ``cache_backend`` is given.
+    :param cache_eviction: Optional. Which cached responses are evicted first when a
+                           limit is reached: the least recently used ones (``lru``)
+                           or the least frequently used ones (``lfu``).
+    :param rate_limit: Optional. The rate limit to respect for every base URL, as
+                       a ``(requests per second, burst)`` tuple. None means no limit.
+                       See also :meth:`set_rate_limit`.
+    :param max_rate_limit_retries: Optional. How many times a request is retried
+                                   after being rate limited by the server.
+    :param max_retries: Optional. How many times an idempotent request is retried after
+                        a 5xx status code or a connection error, waiting a random,
+                        exponentially growing time between each attempt.
+    :param retry_backoff: Optional. The maximum time in seconds to wait before the first retry.
+    :param breaker_threshold: Optional. After how many consecutive failures the
+                              requests to a base URL stop being made for a while.
+                              See :class:`~aiocvv.retry.CircuitBreaker`.
+    :param breaker_timeout: Optional. For how many seconds the requests to a failing
+                            base URL are not made, raising :class:`~aiocvv.errors.CircuitBreakerOpen`.
+    :param stale_while_revalidate: Optional. Whether to return a cached response
+                                   right away even if it has expired, while it's
+                                   revalidated in the background. The next requests
+                                   will get the updated one.
+    :param persist_tokens: Optional. Whether to keep the tokens on disk, so that they're
+                           reused between runs. Looking them up means hashing the password,
+                           which takes a few hundred milliseconds the first time.
+    :param json_loads: Optional. The function used to parse the JSON responses.
+                       By default, the fastest JSON library installed is used
+                       (see :mod:`aiocvv.codec`).
+    :param max_concurrency: Optional. How many requests this client can have in flight
+                            at once. None means no limit other than the connector's.
+    :param cache_backend: Optional. Where the cache is stored, which is
+                          on disk by default. See :mod:`aiocvv.backends`.
+                          It's not closed by :meth:`close`.
+    :param cassette: Optional. A cassette to record the requests to, or to replay them
+                     from. See :class:`~aiocvv.cassette.Cassette`. Unless it's only
+                     recording, the client keeps its cache and tokens in memory,
+                     ignoring ``cache_backend``, ``response_cache``, ``token_store``
+                     and ``persist_tokens``.
+    :param metrics: Optional. Where the metrics of the client are recorded, which can be
+                    shared with other clients. See :class:`~aiocvv.metrics.Metrics`.
+                    The requests sent through a given ``session`` are only measured
+                    if it uses :meth:`~aiocvv.metrics.Metrics.trace_config`.
+    :param session: Optional. An HTTP session to share with other clients.
+                    It's not closed by :meth:`close`, and the connector options are ignored.
+    :param token_store: Optional. The token store to share with other clients.
+    :param response_cache: Optional. The response cache to share with other clients.
+                           It's not closed by :meth:`close`, and the other cache options are ignored.
+    :param rate_limiters: Optional. The rate limiters to share with other clients, by base URL.
+    :param circuit_breakers: Optional. The circuit breakers to share with other clients, by base URL.
 
     :type username: str
     :type password: str
     :type identity: str
     :type loop: asyncio.AbstractEventLoop
     :type base_url: str
+    :type strict_caching: bool
+    :type connector_limit: int
+    :type connector_limit_per_host: int
+    :type keepalive_timeout: float
+    :type dns_cache_ttl: Optional[int]
+    :type memory_cache_size: int
+    :type memory_cache_bytes: Optional[int]
+    :type disk_cache_bytes: int
+    :type cache_eviction: str
+    :type rate_limit: Optional[Tuple[float, int]]
+    :type max_rate_limit_retries: int
+    :type max_retries: int
+    :type retry_backoff: float
+    :type breaker_threshold: int
+    :type breaker_timeout: float
+    :type stale_while_revalidate: bool
+    :type persist_tokens: bool
+    :type json_loads: Optional[Callable[[Union[bytes, str]], Any]]
+    :type max_concurrency: Optional[int]
+    :type cache_backend: Optional[CacheBackend]
+    :type cassette: Optional[Cassette]
+    :type metrics: Optional[Metrics]
+    :type session: Optional[aiohttp.ClientSession]
+    :type token_store: Optional[TokenStore]
+    :type response_cache: Optional[ResponseCache]
+    :type rate_limiters: Optional[Dict[str, RateLimiter]]
+    :type circuit_breakers: Optional[Dict[str, CircuitBreaker]]
+
+    The client keeps a single HTTP session open, so connections are reused
+    across requests. Use it as an asynchronous context manager, or call
+    :meth:`close` when you're done with it:
+
+    .. code-block:: python
+
+        async with ClassevivaClient("username", "password") as client:
+            print(client.me.name)
+
+    To use many accounts at once, see :class:`~aiocvv.pool.ClientPool`.
     """
 
     def __init__(
@@ -94,12 +214,67 @@ class ClassevivaClient:
         loop: Optional[asyncio.AbstractEventLoop] = None,
         base_url: str = "https://web.spaggiari.eu/rest/v1/",
         strict_caching: bool = True,
+        connector_limit: int = 100,
+        connector_limit_per_host: int = 0,
+        keepalive_timeout: float = 30.0,
+        dns_cache_ttl: Optional[int] = 300,
+        memory_cache_size: int = 512,
+        memory_cache_bytes: Optional[int] = None,
+        disk_cache_bytes: int = 2**30,
+        cache_eviction: str = "lru",
+        rate_limit: Optional[Tuple[float, int]] = None,
+        max_rate_limit_retries: int = 3,
+        max_retries: int = 2,
+        retry_backoff: float = 0.5,
+        breaker_threshold: int = 5,
+        breaker_timeout: float = 30.0,
+        stale_while_revalidate: bool = False,
+        persist_tokens: bool = True,
+        json_loads: Optional[JSONLoads] = None,
+        max_concurrency: Optional[int] = None,
+        cache_backend: Optional[CacheBackend] = None,
+        cassette: Optional[Cassette] = None,
+        metrics: Optional[Metrics] = None,
+        session: Optional[aiohttp.ClientSession] = None,
+        token_store: Optional[TokenStore] = None,
+        response_cache: Optional[ResponseCache] = None,
+        rate_limiters: Optional[Dict[str, RateLimiter]] = None,
+        circuit_breakers: Optional[Dict[str, CircuitBreaker]] = None,
     ):
         self.loop = loop or asyncio.get_event_loop()
         self.__username = username
         self.__password = password
         self.__identity = identity
         self._cache_path = os.path.join(user_cache_dir(), "aiocvv")
+        if cassette is not None and cassette.mode != "record":
+            # what's replayed, like the scrubbed tokens, must never reach
+            # the cache or the tokens that the live clients use
+            response_cache = token_store = None
+            cache_backend = MemoryBackend()
+            persist_tokens = False
+
+        # a backend given by the user is closed by the user
+        self.__owns_responses = response_cache is None and cache_backend is None
+        if cache_backend is None:
+            cache_backend = (
+                response_cache.backend
+                if response_cache is not None
+                else DiskCacheBackend(
+                    self._cache_path,
+                    size_limit=disk_cache_bytes,
+                    eviction=cache_eviction,
+                    loop=self.loop,
+                )
+            )
+
+        self.cache_backend = cache_backend
+        self._responses = response_cache or ResponseCache(
+            cache_backend,
+            maxsize=memory_cache_size,
+            max_bytes=memory_cache_bytes,
+            eviction=cache_eviction,
+        )
+        self._tokens = token_store or TokenStore()
         self.__auth = AuthenticationModule(
             self
         )  # NOTE: keeping this private for obvious reasons
@@ -108,8 +283,37 @@ class ClassevivaClient:
         self.__parents = None
         self.__me = None
         self._base_url = base_url
-        self.__parsed_base = urlparse(base_url)
         self.strict_caching = strict_caching
+        self.max_rate_limit_retries = max_rate_limit_retries
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.__breaker_options = (breaker_threshold, breaker_timeout)
+        self.__breakers: Dict[str, CircuitBreaker] = (
+            {} if circuit_breakers is None else circuit_breakers
+        )
+        self.__rate_limit = rate_limit
+        self.__limiters: Dict[str, RateLimiter] = (
+            {} if rate_limiters is None else rate_limiters
+        )
+        self.stale_while_revalidate = stale_while_revalidate
+        self.cassette = cassette
+        self.metrics = metrics or Metrics()
+        self.persist_tokens = persist_tokens
+        self.json_loads = json_loads or get_loads()
+        self.max_concurrency = max_concurrency
+        self.__semaphore: Optional[asyncio.Semaphore] = None
+        self.__owns_session = session is None
+        self.__session = session
+        self.__inflight: Dict[str, asyncio.Future] = {}
+        self.__coalescing = {"started": 0, "coalesced": 0}
+        self.__revalidating: Dict[str, asyncio.Task] = {}
+        self.__connector_options = {
+            "limit": connector_limit,
+            "limit_per_host": connector_limit_per_host,
+            "keepalive_timeout": keepalive_timeout,
+            "use_dns_cache": dns_cache_ttl is not None,
+            "ttl_dns_cache": dns_cache_ttl,
+        }
 
     @property
     def base_url(self) -> str:
@@ -134,7 +338,124 @@ class ClassevivaClient:
     @base_url.setter
     def base_url(self, value: str):
         self._base_url = value
-        self.__parsed_base = urlparse(value)
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """
+        The HTTP session used for every request made by this client,
+        including the authentication ones and the ones made by the modules.
+
+        It's created on first use and re-created if it has been closed,
+        unless it's shared with other clients.
+
+        :return: The session instance.
+        """
+        if self.__owns_session and (self.__session is None or self.__session.closed):
+            self.__session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(**self.__connector_options),
+                trace_configs=[self.metrics.trace_config()],
+            )
+
+        return self.__session
+
+    @property
+    def closed(self) -> bool:
+        """Whether the client's HTTP session is closed."""
+        return self.__session is None or self.__session.closed
+
+    async def close(self):
+        """
+        Close the client's HTTP session, all of its pooled connections and the cache backend.
+        The ones shared with other clients are left open.
+
+        The revalidations still running in the background are cancelled,
+        and the cassette, if any, is saved.
+
+        The client can still be used afterwards, in which case a new session will be opened.
+        """
+        tasks = list(self.__revalidating.values())
+        for task in tasks:
+            task.cancel()
+
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self.cassette is not None:
+            await self.cassette.save()
+
+        if self.__owns_session:
+            if self.__session is not None and not self.__session.closed:
+                await self.__session.close()
+
+            self.__session = None
+
+        if self.__owns_responses:
+            await self._responses.close()
+
+    async def cache_usage(self, backend: bool = True) -> Dict[str, Any]:
+        """
+        Get how much space the cached responses are taking,
+        in memory and in the backend, in total and by endpoint family.
+
+        See :meth:`aiocvv.cache.ResponseCache.usage`.
+
+        :param backend: Optional. Whether to include the backend.
+        :return: The usage of the cache.
+        """
+        return await self._responses.usage(backend)
+
+    def get_rate_limiter(self, base_url: Optional[str] = None) -> RateLimiter:
+        """
+        Get the rate limiter used for the requests made to a base URL.
+
+        :param base_url: Optional. The base URL. Defaults to :attr:`base_url`.
+        :return: The rate limiter.
+        """
+        base_url = base_url or self.base_url
+        if base_url not in self.__limiters:
+            self.__limiters[base_url] = RateLimiter(*(self.__rate_limit or ()))
+
+        return self.__limiters[base_url]
+
+    def set_rate_limit(
+        self, rate: Optional[float], burst: int = 1, base_url: Optional[str] = None
+    ):
+        """
+        Set the rate limit to respect for the requests made to a base URL.
+
+        :param rate: How many requests per second can be made on average.
+                     None means there is no limit.
+        :param burst: Optional. How many requests can be made at once.
+        :param base_url: Optional. The base URL. Defaults to :attr:`base_url`.
+        """
+        self.__limiters[base_url or self.base_url] = RateLimiter(rate, burst)
+
+    def get_circuit_breaker(self, base_url: Optional[str] = None) -> CircuitBreaker:
+        """
+        Get the circuit breaker used for the requests made to a base URL.
+
+        :param base_url: Optional. The base URL. Defaults to :attr:`base_url`.
+        :return: The circuit breaker.
+        """
+        base_url = base_url or self.base_url
+        if base_url not in self.__breakers:
+            self.__breakers[base_url] = CircuitBreaker(*self.__breaker_options)
+
+        return self.__breakers[base_url]
+
+    @property
+    def coalescing_stats(self) -> Dict[str, int]:
+        """
+        How many requests have been coalesced by :meth:`request`.
+
+        Identical ``GET``, ``HEAD`` and ``OPTIONS`` requests without a body
+        that are made while one of them is still running share its response
+        instead of being sent again.
+
+        * ``started`` is how many of those requests actually went through;
+        * ``coalesced`` is how many reused the response of one that was already running.
+
+        :return: A dictionary with the counters.
+        """
+        return dict(self.__coalescing)
 
     #          Modules          #
     # Using properties here so only the needed
@@ -256,6 +577,11 @@ class ClassevivaClient:
         :param trace_request_ctx: Optional. The request context for tracing.
         :param read_bufsize: Optional. The read buffer size.
 
+        .. note::
+            Identical ``GET``, ``HEAD`` and ``OPTIONS`` requests without a body
+            that are made while one of them is still running are coalesced,
+            so they all wait for the same response. See :attr:`coalescing_stats`.
+
         :type method: str
         :type endpoint: str
         :type params: Optional[Mapping[str, str]]
@@ -280,6 +606,357 @@ class ClassevivaClient:
 
         :return: The HTTP response dictionary.
         """
+        endpoint = self.__absolute_url(endpoint)
+        kwargs = {
+            "data": data,
+            "json": json,
+            "cookies": cookies,
+            "skip_auto_headers": skip_auto_headers,
+            "compress": compress,
+            "chunked": chunked,
+            "read_until_eof": read_until_eof,
+            "proxy": proxy,
+            "timeout": timeout,
+            "verify_ssl": verify_ssl,
+            "fingerprint": fingerprint,
+            "ssl_context": ssl_context,
+            "ssl": ssl,
+            "proxy_headers": proxy_headers,
+            "trace_request_ctx": trace_request_ctx,
+            "read_bufsize": read_bufsize,
+        }
+
+        cache_key = request_key(method, endpoint, params)
+        if method.upper() in SAFE_METHODS and data is None and json is None:
+            # identical requests share the same round trip while it's running
+            task = self.__inflight.get(cache_key)
+            if task is None:
+                task = asyncio.ensure_future(
+                    self.__send(method, endpoint, cache_key, params, headers, kwargs)
+                )
+                self.__inflight[cache_key] = task
+                task.add_done_callback(lambda t: self.__forget_inflight(cache_key, t))
+                self.__coalescing["started"] += 1
+            else:
+                self.__coalescing["coalesced"] += 1
+                self.metrics.record_coalesced()
+
+            ret = await asyncio.shield(task)
+        else:
+            ret = await self.__send(
+                method, endpoint, cache_key, params, headers, kwargs
+            )
+
+        if raise_for_status and (ret["status"] < 200 or ret["status"] >= 300):
+            raise find_exc(ret)
+
+        return ret
+
+    async def request_many(
+        self,
+        requests: Iterable[RequestSpec],
+        *,
+        concurrency: int = 10,
+        return_exceptions: bool = True,
+    ) -> List[Union[Response, Exception]]:
+        """
+        Make many requests, running at most ``concurrency`` of them at once.
+
+        Every request is made with :meth:`request`, so identical requests are
+        coalesced and fresh cached responses are returned without being sent.
+
+        Each request can be either:
+
+        * an endpoint, to make a ``GET`` request to it;
+        * a ``(method, endpoint)`` tuple;
+        * a mapping with the ``method`` (``GET`` by default) and the ``endpoint``
+          of the request, along with any other argument of :meth:`request`.
+
+        .. code-block:: python
+
+            grades, notes, absences = await client.request_many([
+                f"students/{sid}/grades2",
+                ("GET", f"students/{sid}/notes/all"),
+                {"endpoint": f"students/{sid}/absences/details", "raise_for_status": False},
+            ])
+
+        :param requests: The requests to make.
+        :param concurrency: Optional. How many requests can be made at once.
+        :param return_exceptions: Optional. Whether to return the exception raised by
+                                  a failed request in its place, instead of raising
+                                  the first one and cancelling the others.
+
+        :type requests: Iterable[Union[str, Tuple[str, str], Mapping[str, Any]]]
+        :type concurrency: int
+        :type return_exceptions: bool
+
+        :return: The responses, in the same order as the requests.
+        """
+
+        def send(spec: RequestSpec) -> Awaitable[Response]:
+            if isinstance(spec, str):
+                return self.request("GET", spec)
+
+            if isinstance(spec, Mapping):
+                kwargs = dict(spec)
+                return self.request(
+                    kwargs.pop("method", "GET"), kwargs.pop("endpoint"), **kwargs
+                )
+
+            method, endpoint = spec
+            return self.request(method, endpoint)
+
+        return await gather_bounded(send, requests, concurrency, return_exceptions)
+
+    def __forget_inflight(self, key: str, task: asyncio.Future):
+        if self.__inflight.get(key) is task:
+            del self.__inflight[key]
+
+        if not task.cancelled():
+            # mark the exception as retrieved, the callers will handle it
+            task.exception()
+
+    async def __auth_headers(self, headers: Optional[LooseHeaders]) -> LooseHeaders:
+        login = await self.__auth.login(
+            self.__username, self.__password, self.__identity
+        )
+        _headers = {
+            "User-Agent": CLIENT_USER_AGENT,
+            "Z-Dev-Apikey": CLIENT_DEV_APIKEY,
+            "Content-Type": CLIENT_CONTENT_TP,
+            "Z-Auth-Token": login["token"],
+        }
+
+        if headers:
+            headers.update(_headers)
+            return headers
+
+        return _headers
+
+    @asynccontextmanager
+    async def _connect(
+        self, method: str, endpoint: str, **kwargs
+    ) -> AsyncIterator[aiohttp.ClientResponse]:
+        """
+        Send a request, dealing with rate limits, retries and the circuit breaker.
+        This is used by the client itself and the authentication module.
+        """
+        limiter = self.get_rate_limiter()
+        breaker = self.get_circuit_breaker()
+        # streamed bodies can only be sent once
+        data = kwargs.get("data")
+        replayable = not hasattr(data, "__aiter__") and not hasattr(data, "read")
+        retryable = replayable and method.upper() in IDEMPOTENT_METHODS
+        rate_limited = failures = 0
+        wait = 0.0
+        while True:
+            if wait:
+                await asyncio.sleep(wait)
+                wait = 0.0
+
+            async with self.__slot():
+                breaker.before_request()
+                await limiter.acquire()
+                try:
+                    if self.cassette is None:
+                        resp = await self.session.request(
+                            method, endpoint, raise_for_status=False, **kwargs
+                        )
+                    else:
+                        resp = await self.cassette.play(
+                            self.session, method, endpoint, **kwargs
+                        )
+                except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                    breaker.record_failure()
+                    if not retryable or failures >= self.max_retries:
+                        raise
+
+                    wait = backoff_delay(failures, self.retry_backoff)
+                    failures += 1
+                    self.metrics.record_retry("connection_error")
+                    continue
+
+                try:
+                    if (
+                        resp.status == 429
+                        and replayable
+                        and rate_limited < self.max_rate_limit_retries
+                    ):
+                        # wait as much as the server asks to, or back off exponentially
+                        delay = parse_retry_after(resp.headers.get("Retry-After"))
+                        limiter.pause(2**rate_limited if delay is None else delay)
+                        rate_limited += 1
+                        self.metrics.record_retry("rate_limited")
+                        continue
+
+                    if resp.status >= 500:
+                        breaker.record_failure()
+                        if retryable and failures < self.max_retries:
+                            wait = backoff_delay(failures, self.retry_backoff)
+                            failures += 1
+                            self.metrics.record_retry("server_error")
+                            continue
+                    else:
+                        breaker.record_success()
+
+                    yield resp
+                    return
+                finally:
+                    resp.release()
+
+    @asynccontextmanager
+    async def __slot(self) -> AsyncIterator[None]:
+        # holds one of the max_concurrency slots, if there is a limit
+        if self.max_concurrency is None:
+            yield
+            return
+
+        if self.__semaphore is None:
+            self.__semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async with self.__semaphore:
+            yield
+
+    def __build_response(
+        self, resp: aiohttp.ClientResponse, read_data: bytes
+    ) -> Response:
+        # the body is decoded only when the content is first needed
+        return Response(
+            datetime.now().timestamp(),
+            read_data,
+            resp.headers,
+            resp.status,
+            resp.reason,
+            self.json_loads,
+        )
+
+    async def __send(
+        self,
+        method: str,
+        endpoint: str,
+        cache_key: str,
+        params: Optional[Mapping[str, str]],
+        headers: Optional[LooseHeaders],
+        kwargs: dict,
+    ) -> Response:
+        headers = await self.__auth_headers(headers)
+        started = time.perf_counter()
+        cached = await self._responses.get(cache_key)
+        lookup = time.perf_counter() - started
+        if not isinstance(cached, Response):
+            # nothing cached, or a plain dict left by an older version
+            cached = None
+
+        safe = method.upper() in SAFE_METHODS
+        if cached is not None:
+            headers["If-None-Match"] = cached.etag
+            if self.__is_fresh(cached):
+                if safe:
+                    self.metrics.record_cache("hit", lookup)
+
+                return cached
+
+            if (
+                self.stale_while_revalidate
+                and safe
+                and kwargs.get("data") is None
+                and kwargs.get("json") is None
+            ):
+                self.__revalidate(
+                    method, endpoint, cache_key, cached, params, headers, kwargs
+                )
+                self.metrics.record_cache("stale", lookup)
+                return cached
+
+        ret = await self.__fetch(
+            method, endpoint, cache_key, cached, params, headers, kwargs
+        )
+        data = kwargs.get("data")
+        if (
+            ret.status == 401
+            and not hasattr(data, "__aiter__")
+            and not hasattr(data, "read")
+        ):
+            # the token has been revoked before it expired, so it's replaced once
+            # (unless the body is streamed, since it can only be sent once)
+            await self.__auth.invalidate(
+                self.__username,
+                self.__password,
+                self.__identity,
+                headers["Z-Auth-Token"],
+            )
+            headers = await self.__auth_headers(headers)
+            ret = await self.__fetch(
+                method, endpoint, cache_key, cached, params, headers, kwargs
+            )
+
+        if safe:
+            if cached is None:
+                result = "miss"
+            else:
+                result = "not_modified" if ret is cached else "expired"
+
+            self.metrics.record_cache(result, lookup)
+
+        return ret
+
+    async def __fetch(
+        self,
+        method: str,
+        endpoint: str,
+        cache_key: str,
+        cached: Optional[Response],
+        params: Optional[Mapping[str, str]],
+        headers: LooseHeaders,
+        kwargs: dict,
+    ) -> Response:
+        async with self._connect(
+            method, endpoint, params=params, headers=headers, **kwargs
+        ) as resp:
+            if resp.status == 304:
+                if self.strict_caching:
+                    # keep this cached for longer until it expires again
+                    cached.created_at = datetime.now().timestamp()
+                    await self._responses.set(cache_key, cached)
+
+                return cached
+
+            ret = self.__build_response(resp, await resp.read())
+            if ret.etag:
+                await self._responses.set(cache_key, ret)
+
+            return ret
+
+    def __revalidate(
+        self,
+        method: str,
+        endpoint: str,
+        cache_key: str,
+        cached: Response,
+        params: Optional[Mapping[str, str]],
+        headers: LooseHeaders,
+        kwargs: dict,
+    ):
+        # updates a stale response in the background, once at a time
+        if cache_key in self.__revalidating:
+            return
+
+        task = self.loop.create_task(
+            self.__fetch(method, endpoint, cache_key, cached, params, headers, kwargs)
+        )
+        self.__revalidating[cache_key] = task
+        task.add_done_callback(lambda t: self.__forget_revalidation(cache_key, t))
+
+    def __forget_revalidation(self, key: str, task: asyncio.Future):
+        if self.__revalidating.get(key) is task:
+            del self.__revalidating[key]
+
+        if not task.cancelled():
+            # the stale response has already been returned, so a failed
+            # revalidation is ignored and the next request will try again
+            task.exception()
+
+    def __absolute_url(self, endpoint: str) -> str:
         if urlsplit(endpoint).scheme:
             raise ValueError(
                 f"Invalid URL given: The URL provided is not for {self.base_url}."
@@ -288,117 +965,112 @@ class ClassevivaClient:
         if not endpoint.startswith(self.base_url):
             endpoint = urljoin(self.base_url, endpoint.lstrip("/"))
 
-        login = await self.__auth.login(
-            self.__username, self.__password, self.__identity
-        )
-        token = login["token"]
+        return endpoint
 
-        parsed_url = urlparse(endpoint)
-        cache_ = await self.loop.run_in_executor(None, Cache, self._cache_path)
-        if self.base_url not in cache_:
-            cache_[self.base_url] = {}
+    async def stream(
+        self,
+        method: str,
+        endpoint: str,
+        *,
+        params: Optional[Mapping[str, str]] = None,
+        json: Optional[dict] = None,  # pylint: disable=redefined-outer-name
+        headers: Optional[LooseHeaders] = None,
+        chunk_size: int = 64 * 1024,
+        raise_for_status: bool = True,
+    ) -> AsyncIterator[bytes]:
+        """
+        Make a raw HTTP request to the Classeviva REST APIs,
+        yielding the body of the response in chunks as it's received.
 
-        cache = cache_[self.base_url]
+        This is meant for files, like attachments and avatars, so that they
+        never have to be held in memory all at once. Unlike :meth:`request`,
+        the response is never cached nor decoded.
 
-        if "requests" not in cache:
-            cache["requests"] = {}
+        :param method: The HTTP method to use.
+        :param endpoint: The path for the request, relative to :attr:`base_url`.
+        :param params: Optional. The query parameters for the request.
+        :param json: Optional. The request body JSON data.
+        :param headers: Optional. The headers to include in the request.
+        :param chunk_size: Optional. The maximum size of each chunk, in bytes.
+        :param raise_for_status: Optional. Whether to raise an exception for non-successful responses.
+                                 If False, the body of the error is yielded instead.
 
-        reqs_cache = cache["requests"]
-        part = parsed_url.path[len(self.__parsed_base.path) :]
+        :type method: str
+        :type endpoint: str
+        :type params: Optional[Mapping[str, str]]
+        :type json: dict
+        :type headers: Optional[LooseHeaders]
+        :type chunk_size: int
+        :type raise_for_status: bool
+
+        :return: An asynchronous iterator of the chunks of the body.
+        """
+        endpoint = self.__absolute_url(endpoint)
+        headers = await self.__auth_headers(headers)
+        async with self._connect(
+            method, endpoint, params=params, json=json, headers=headers
+        ) as resp:
+            if raise_for_status and (resp.status < 200 or resp.status >= 300):
+                raise find_exc(self.__build_response(resp, await resp.read()))
+
+            async for chunk in resp.content.iter_chunked(chunk_size):
+                yield chunk
+
+    async def download(
+        self,
+        endpoint: str,
+        path: Union[str, "os.PathLike[str]"],
+        *,
+        params: Optional[Mapping[str, str]] = None,
+        chunk_size: int = 64 * 1024,
+    ) -> str:
+        """
+        Download a file from the Classeviva REST APIs straight to the disk.
+
+        The body is streamed using :meth:`stream`, and every write runs in
+        an executor so that it doesn't block the event loop. If the download
+        fails, the partially written file is removed.
 
+        :param endpoint: The path for the request, relative to :attr:`base_url`.
+        :param path: The path of the file to write to.
+        :param params: Optional. The query parameters for the request.
+        :param chunk_size: Optional. The maximum size of each chunk, in bytes.
+
+        :type endpoint: str
+        :type path: Union[str, os.PathLike]
+        :type params: Optional[Mapping[str, str]]
+        :type chunk_size: int
+
+        :return: The path of the written file.
+        """
+        path = os.fspath(path)
+        file = await self.loop.run_in_executor(None, open, path, "wb")
         try:
-            _headers = {
-                "User-Agent": CLIENT_USER_AGENT,
-                "Z-Dev-Apikey": CLIENT_DEV_APIKEY,
-                "Content-Type": CLIENT_CONTENT_TP,
-                "Z-Auth-Token": token,
-            }
-
-            if headers:
-                headers.update(_headers)
-            else:
-                headers = _headers
-
-            if part in reqs_cache:
-                headers["If-None-Match"] = reqs_cache[part]["etag"]
-                old_req_headers = reqs_cache[part]["headers"]
-                headers_lower = {k.lower(): v for k, v in old_req_headers.items()}
-                if "z-cache-control" in headers_lower:
-                    for val in headers_lower["z-cache-control"].split(","):
-                        k, v = val.strip().split("=")
-                        if k.strip() == "max-age":
-                            expires_at = datetime.fromtimestamp(
-                                reqs_cache[part]["created_at"] + int(v.strip(" ;"))
-                            )
-                            if expires_at > datetime.now():
-                                resp = reqs_cache[part]
-                                if raise_for_status and (
-                                    resp["status"] < 200 or resp["status"] >= 300
-                                ):
-                                    raise find_exc(resp)
-
-                                return resp
-
-            async with aiohttp.ClientSession() as session:
-                async with session.request(
-                    method,
-                    endpoint,
-                    params=params,
-                    data=data,
-                    json=json,
-                    cookies=cookies,
-                    headers=headers,
-                    skip_auto_headers=skip_auto_headers,
-                    compress=compress,
-                    chunked=chunked,
-                    raise_for_status=False,
-                    read_until_eof=read_until_eof,
-                    proxy=proxy,
-                    timeout=timeout,
-                    verify_ssl=verify_ssl,
-                    fingerprint=fingerprint,
-                    ssl_context=ssl_context,
-                    ssl=ssl,
-                    proxy_headers=proxy_headers,
-                    trace_request_ctx=trace_request_ctx,
-                    read_bufsize=read_bufsize,
-                ) as resp:
-                    if resp.status == 304:
-                        if self.strict_caching:
-                            # keep this cached for longer until it expires again
-                            reqs_cache[part]["created_at"] = datetime.now().timestamp()
-
-                        return reqs_cache[part]
-
-                    read_data = await resp.content.read()
-                    content = read_data
-
-                    try:
-                        content = _json.loads(content)
-                    except (_json.JSONDecodeError, UnicodeDecodeError) as e:
-                        # this is not JSON
-                        if not isinstance(e, UnicodeDecodeError):
-                            content = read_data.decode()
-
-                    etag = resp.headers.get("ETag")
-                    ret = {
-                        "created_at": datetime.now().timestamp(),
-                        "content": content,
-                        "headers": dict(resp.headers),
-                        "status": resp.status,
-                        "status_reason": resp.reason,
-                    }
-                    if etag:
-                        ret["etag"] = etag
-                        reqs_cache[part] = ret
-
-                    if raise_for_status and (resp.status < 200 or resp.status >= 300):
-                        raise find_exc(ret)
-
-                    return ret
-        finally:
-            cache_[self.base_url] = cache
-            await self.loop.run_in_executor(None, cache_.close)
+            async for chunk in self.stream(
+                "GET", endpoint, params=params, chunk_size=chunk_size
+            ):
+                await self.loop.run_in_executor(None, file.write, chunk)
+        except BaseException:
+            await self.loop.run_in_executor(None, file.close)
+            await self.loop.run_in_executor(None, os.remove, path)
+            raise
+
+        await self.loop.run_in_executor(None, file.close)
+        return path
+
+    @staticmethod
+    def __is_fresh(response: Response) -> bool:
+        cache_control = response.headers.get("Z-Cache-Control")
+        if cache_control:
+            for val in cache_control.split(","):
+                k, v = val.strip().split("=")
+                if k.strip() == "max-age":
+                    expires_at = datetime.fromtimestamp(
+                        response.created_at + int(v.strip(" ;"))
+                    )
+                    return expires_at > datetime.now()
+
+        return False
 
     async def login(self, raise_exceptions: bool = True):
         """
@@ -444,3 +1116,9 @@ class ClassevivaClient:
 
     def __await__(self):
         return self.__await_login().__await__()
+
+    async def __aenter__(self) -> Self:
+        return await self.__await_login()
+
+    async def __aexit__(self, *_):
+        await self.close()
@@ -0,0 +1,99 @@
+"""
+This module contains the functions used to decode the bodies of the
+responses from the Classeviva API.
+
+The fastest JSON library installed is used: `orjson <https://pypi.org/project/orjson/>`_,
+then `ujson <https://pypi.org/project/ujson/>`_, and the standard library otherwise.
+"""
+
+import json
+from typing import Any, Callable, Optional, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import ujson
+except ImportError:  # pragma: no cover
+    ujson = None
+
+JSONLoads = Callable[[Union[bytes, str]], Any]
+
+LOADERS = {"json": json.loads}
+if ujson is not None:
+    LOADERS["ujson"] = ujson.loads
+
+if orjson is not None:
+    LOADERS["orjson"] = orjson.loads
+
+# what a JSON document from the Classeviva API can start with
+_JSON_START = (b"{", b"[", b'"')
+
+
+def get_loads(name: Optional[str] = None) -> JSONLoads:
+    """
+    Get the function used to parse JSON documents.
+
+    :param name: Optional. The name of the library to use, which can be ``orjson``,
+                 ``ujson`` or ``json``. By default, the fastest installed one is used.
+    :return: The function.
+    """
+    if name is None:
+        name = next(n for n in ("orjson", "ujson", "json") if n in LOADERS)
+
+    try:
+        return LOADERS[name]
+    except KeyError:
+        raise ValueError(f"{name!r} is not installed or is not supported") from None
+
+
+def parse_content_type(content_type: str):
+    """
+    Split the value of a ``Content-Type`` header.
+
+    :param content_type: The header value.
+    :return: The lowercase MIME type and the charset, if any.
+    """
+    mime, *params = content_type.split(";")
+    charset = None
+    for param in params:
+        key, _, value = param.partition("=")
+        if key.strip().lower() == "charset":
+            charset = value.strip().strip('"') or None
+
+    return mime.strip().lower(), charset
+
+
+def decode_body(data: bytes, content_type: str, loads: JSONLoads = json.loads) -> Any:
+    """
+    Decode the body of a response, according to its ``Content-Type``.
+
+    * JSON bodies are parsed with the given function;
+    * Text bodies, and the ones without a type, are parsed only if they look
+      like JSON, since the API doesn't always send the right type, and are
+      decoded as text otherwise;
+    * Any other body, like images and documents, is left as it is.
+
+    :param data: The body.
+    :param content_type: The value of the ``Content-Type`` header, or an empty string.
+    :param loads: Optional. The function used to parse JSON documents.
+    :return: The parsed JSON document, the text or the bytes of the body.
+    """
+    mime, charset = parse_content_type(content_type)
+    is_json = mime == "application/json" or mime.endswith("+json")
+    if mime and not is_json and not mime.startswith("text/"):
+        return data
+
+    if is_json or data[:64].lstrip()[:1] in _JSON_START:
+        try:
+            return loads(data)
+        except ValueError:
+            # this is not JSON after all (UnicodeDecodeError is a ValueError too)
+            pass
+
+    try:
+        return data.decode(charset or "utf-8")
+    except (LookupError, UnicodeDecodeError):
+        return data
@@ -420,5 +420,20 @@ class Day(SchoolDay):
         )
 
 
+@dataclass(frozen=True)
+class PeriodRecords:
+    """
+    Represents everything that happened during a school period.
+
+    :param grades: The grades given during the period.
+    :param notes: The notes assigned during the period.
+    :param absences: The absences during the period.
+    """
+
+    grades: List[Grade]
+    notes: List[Note]
+    absences: List[AbsenceDay]
+
+
 # This has been imported here to avoid circular imports
 from .helpers.calendar.period import Period
@@ -2,6 +2,8 @@
 This module contains the custom exceptions raised by the library.
 """
 
+from collections.abc import Mapping
+
 
 class ClassevivaError(Exception):
     """
@@ -12,7 +14,7 @@ class ClassevivaError(Exception):
 
     def __init__(self, response):
         desc = response
-        if isinstance(response, dict):
+        if isinstance(response, Mapping):
             content = response["content"]
             self.error = content["error"]
             self.message = content.get("message", "")
@@ -89,6 +91,13 @@ class ServiceUnavailable(InternalServerError):
     status_code = 503
 
 
+class CircuitBreakerOpen(ServiceUnavailable):
+    """
+    The server returned too many 5xx status codes in a row, or couldn't be reached,
+    so the client is not sending requests to it for a while.
+    """
+
+
 # Authentication errors
 class AuthenticationError(ClassevivaError):
     """
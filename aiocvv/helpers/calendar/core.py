@@ -6,7 +6,8 @@ This class is used to get information about the user's calendar,
 such as school days, absences, events, grades, notes, and more.
 """
 
-from typing import Optional, List, AsyncIterator
+import asyncio
+from typing import Optional, List, AsyncIterator, Dict, Mapping
 from datetime import datetime, timedelta, date
 from ...utils import parse_date, group_by_date, create_repr
 from ...modules import StudentsModule
@@ -20,6 +21,9 @@ from ...dataclasses import (
     PartialSubject,
     Lesson,
     Day,
+    Grade,
+    Note,
+    PeriodRecords,
 )
 from ...enums import (
     SchoolDayStatus,
@@ -43,6 +47,8 @@ class Calendar:
     ):  # pylint: disable=redefined-builtin
         self.module = module
         self.id = id
+        # the last partition, along with what it's been built from
+        self.__partition = None
 
     @staticmethod
     def __dateify(string: str):
@@ -66,7 +72,7 @@ class Calendar:
         )
 
     @classmethod
-    def __parse_event(cls, ev: dict, subjects: List[Subject]):
+    def __parse_event(cls, ev: dict, subjects: Mapping[int, Subject]):
         return Event(
             id=ev["evtId"],
             type=EventCode(ev["evtCode"]),
@@ -76,11 +82,7 @@ class Calendar:
             notes=ev["notes"],
             author=ev["authorName"],
             class_desc=ev["classDesc"],
-            subject=(
-                list(filter(lambda s: s.id == ev["subjectId"], subjects))[0]
-                if ev["subjectId"]
-                else None
-            ),
+            subject=subjects.get(ev["subjectId"]) if ev["subjectId"] else None,
             homework=ev["homeworkId"],
             homework_item=ev.get("homeworkItem", None),
         )
@@ -156,7 +158,8 @@ class Calendar:
         :return: A list of :class:`~aiocvv.dataclasses.AgendaDay` objects.
         """
         ret = await self.module.agenda(self.id, begin, end, event_code)
-        subjects = await self.module.client.me.get_subjects()
+        me = self.module.client.me
+        subjects = await me._subjects_by_id()  # pylint: disable=protected-access
 
         if not separate_days:
             return [
@@ -190,11 +193,89 @@ class Calendar:
         """
         Get the periods of the student's school.
 
-        :return: A list of :class:`~aiocvv.dataclasses.Period` objects.
+        :return: A list of :class:`~aiocvv.helpers.calendar.Period` objects.
+        """
+        return await self.module.client.me.get_periods()
+
+    async def partition_by_period(self) -> Dict[Period, PeriodRecords]:
+        """
+        Get the grades, the notes and the absences of every period at once.
+
+        Each of them is fetched once for the whole school year and split
+        among the periods in a single pass, unless none of them has
+        changed since the last time. The methods of
+        :class:`~aiocvv.helpers.calendar.Period` read the last result
+        without sending any request, so going through all of the periods
+        doesn't download and parse everything again. Call this (or
+        :meth:`~aiocvv.me.Student.refresh`) to get them up to date.
+
+        :return: The records of each period, in the periods' order.
+        """
+        me = self.module.client.me
+        grades, notes, absences, (subjects, periods) = await asyncio.gather(
+            self.module.grades(self.id),
+            self.module.notes(self.id),
+            self.module.absences(self.id),
+            me._registries(),  # pylint: disable=protected-access
+        )
+
+        versions = [resp.etag or resp.body for resp in (grades, notes, absences)]
+        cached = self.__partition
+        if (
+            cached is None
+            or cached[0] != versions
+            or cached[1] is not subjects
+            or cached[2] is not periods
+        ):
+            # pylint: disable=protected-access
+            records = self.__partition_records(
+                [
+                    me._parse_grade(g, subjects, periods)
+                    for g in grades["content"]["grades"]
+                ],
+                me._parse_notes(notes["content"]),
+                [self.__parse_absence(evt) for evt in absences["content"]["events"]],
+                list(periods.values()),
+            )
+            cached = self.__partition = (versions, subjects, periods, records)
+
+        return dict(cached[3])
+
+    async def _partition(self) -> Dict[Period, PeriodRecords]:
+        """
+        Get the last partition built by :meth:`partition_by_period`,
+        building it only if there's none yet.
+
+        :return: The records of each period. They must not be changed.
         """
+        if self.__partition is None:
+            await self.partition_by_period()
 
-        ret = await self.module.periods(self.id)
-        return [Period(self, **period) for period in ret["content"]["periods"]]
+        return self.__partition[3]
+
+    def _forget_partition(self):
+        """Make the next :meth:`_partition` build the partition again."""
+        self.__partition = None
+
+    @staticmethod
+    def __partition_records(
+        grades: List[Grade],
+        notes: List[Note],
+        absences: List[AbsenceDay],
+        periods: List[Period],
+    ) -> Dict[Period, PeriodRecords]:
+        buckets = {period: PeriodRecords([], [], []) for period in periods}
+        for grade in grades:
+            buckets[grade.period].grades.append(grade)
+
+        # notes and absences have no period of their own, only a date
+        for records, attr in ((notes, "notes"), (absences, "absences")):
+            for record in records:
+                for period in periods:
+                    if period.start <= record.date <= period.end:
+                        getattr(buckets[period], attr).append(record)
+
+        return buckets
 
     async def get_day(self, start: Date, end: Optional[Date] = None):
         """
@@ -207,8 +288,8 @@ class Calendar:
         :return: A list of :class:`~aiocvv.dataclasses.Day` objects.
         """
 
-        subjects = await self.module.client.me.get_subjects()
-        periods = await self.get_periods()
+        me = self.module.client.me
+        subjects, periods = await me._registries()  # pylint: disable=protected-access
         schooldays = await self.module.calendar(self.id, start, end or start)
         schooldays = schooldays["content"]
         return await self.__do_get_day(subjects, periods, schooldays, start, end)
@@ -238,8 +319,8 @@ class Calendar:
                 group_by_date(data["notes"][tp.value], me._parse_note, tp)
             )  # pylint: disable=protected-access
 
-        # merge all the days together without duplicates
-        days = list(
+        # merge all the days together without duplicates, in date order
+        days = sorted(
             set(
                 list(lessons.keys())
                 + list(agenda.keys())
@@ -272,30 +353,41 @@ class Calendar:
 
         return ret
 
-    @staticmethod
-    def __filter_check(begin: Date, day: int):
-        def chk(d: Day):
-            return d.date == (begin + timedelta(days=day)).date()
-
-        return chk
-
-    async def __call__(self, begin: Date, end: Date) -> AsyncIterator[Day]:
+    async def __call__(
+        self, begin: Date, end: Date, *, window: int = 31
+    ) -> AsyncIterator[Day]:
         """
         Iterate over the days in a range of dates, returning
         the information available for each day, merging calendar,
         absences, agenda, grades, notes, and school days all together here.
+
+        The range is fetched ``window`` days at a time, with a single request
+        for each of its calendar and overview, and the days are yielded in date
+        order as soon as their window is ready. Only one window at a time
+        is kept in memory, so long ranges can be iterated cheaply.
+
+        :param begin: The start date.
+        :param end: The end date.
+        :param window: Optional. How many days are fetched at once.
+        :return: An asynchronous iterator of :class:`~aiocvv.dataclasses.Day` objects.
         """
+        begin = getattr(begin, "date", lambda: begin)()
+        end = getattr(end, "date", lambda: end)()
         if end < begin:
             raise ValueError("end date cannot be before begin date")
 
-        subjects = await self.module.client.me.get_subjects()
-        periods = await self.get_periods()
-        schooldays = await self.module.calendar(self.id, begin, end or begin)
-        schooldays = schooldays["content"]
-        for day in range((end - begin).days + 1):
-            yield list(
-                filter(
-                    self.__filter_check(begin, day),
-                    await self.__do_get_day(subjects, periods, schooldays, begin, end),
-                )
-            )[0]
+        if window < 1:
+            raise ValueError("window must be at least 1")
+
+        me = self.module.client.me
+        subjects, periods = await me._registries()  # pylint: disable=protected-access
+        start = begin
+        while start <= end:
+            stop = min(start + timedelta(days=window - 1), end)
+            schooldays = await self.module.calendar(self.id, start, stop)
+            for day in await self.__do_get_day(
+                subjects, periods, schooldays["content"], start, stop
+            ):
+                yield day
+
+            start = stop + timedelta(days=1)
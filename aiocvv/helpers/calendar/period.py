@@ -5,7 +5,7 @@ happened during them.
 """
 
 from ...utils import parse_date, create_repr
-from ...dataclasses import Grade, Subject, Note, AbsenceDay
+from ...dataclasses import Grade, Subject, Note, AbsenceDay, PeriodRecords
 from ...enums import NoteType
 from ...types import date
 from typing import List, Optional
@@ -15,6 +15,10 @@ from typing_extensions import Self
 class Period:
     """
     Represents a school period (e.g. first quarter, second quarter, etc.).
+
+    Its grades, notes and absences are read from the last
+    :meth:`~aiocvv.helpers.calendar.Calendar.partition_by_period`,
+    which is made on their first use.
     """
 
     def __init__(self, calendar, **data):
@@ -79,40 +83,39 @@ class Period:
         return self.description
 
     def __eq__(self, other: Self):
+        if not isinstance(other, Period):
+            return NotImplemented
+
         return self.code == other.code
 
+    def __hash__(self):
+        return hash(self.code)
+
+    async def __records(self) -> PeriodRecords:
+        # pylint: disable-next=protected-access
+        partition = await self.__calendar._partition()
+        # the period might not exist anymore
+        return partition.get(self) or PeriodRecords([], [], [])
+
     async def get_grades(self, subject: Optional[Subject] = None) -> List[Grade]:
         """
         Get the grades that were given during the period.
 
+        :param subject: The subject to get the grades from.
         :return: A list of :class:`~aiocvv.dataclasses.Grade` objects.
         """
-        resp = list(
-            filter(
-                lambda g: g["periodPos"] == self.position,
-                (
-                    await self.__calendar.module.grades(
-                        self.__calendar.id, subject.id if subject else None
-                    )
-                )["content"]["grades"],
-            )
-        )
-
-        me = self.__calendar.module.client.me
-        subjects = await me.get_subjects()
-        return [
-            me._parse_grade(g, subjects, [self])  # pylint: disable=protected-access
-            for g in resp
-        ]
+        grades = (await self.__records()).grades
+        return [g for g in grades if subject is None or g.subject.id == subject.id]
 
     async def get_notes(self, type: Optional[NoteType] = None) -> List[Note]:
         """
         Get the notes assigned during the period.
 
+        :param type: The type of the notes to get.
         :return: A list of :class:`~aiocvv.dataclasses.Note` objects.
         """
-        ret: List[Note] = await self.__calendar.module.client.me.get_notes(type)
-        return list(filter(lambda n: self.start <= n.date <= self.end, ret))
+        notes = (await self.__records()).notes
+        return [n for n in notes if type is None or n.type == type]
 
     async def get_absences(self) -> List[AbsenceDay]:
         """
@@ -120,4 +123,4 @@ class Period:
 
         :return: A list of :class:`~aiocvv.dataclasses.AbsenceDay` objects.
         """
-        return await self.__calendar.get_absences(self.start, self.end)
+        return list((await self.__records()).absences)
@@ -5,7 +5,8 @@ The noticeboard can be used both by students and teachers.
 
 # pylint: disable=arguments-differ
 
-from typing import Optional, Any, IO, List, Union
+import os
+from typing import Optional, Any, IO, List, Union, AsyncIterator
 from io import BytesIO
 from ..modules.core import BaseModule, Noticeboard
 from ..types import Response
@@ -61,14 +62,44 @@ class Attachment(File, PartialAttachment):
         self.__item = item
 
     async def download(self):
-        """Download the attachment."""
-        resp = await self.__item.noticeboard.noticeboard.get_attachment(
-            self.__item.noticeboard.id, self.__item.code, self.__item.id, self.num
-        )
-        data = BytesIO(resp["content"])
+        """Download the attachment in memory."""
+        data = BytesIO()
+        async for chunk in self.iter_content():
+            data.write(chunk)
+
         super().__init__(data, self.filename)
         return self
 
+    def iter_content(self, chunk_size: int = 64 * 1024) -> AsyncIterator[bytes]:
+        """
+        Download the attachment in chunks, without keeping it all in memory.
+
+        :param chunk_size: Optional. The maximum size of each chunk, in bytes.
+        :return: An asynchronous iterator of the chunks of the attachment.
+        """
+        return self.__item.noticeboard.noticeboard.stream_attachment(
+            self.__item.noticeboard.id,
+            self.__item.code,
+            self.__item.id,
+            self.num,
+            chunk_size=chunk_size,
+        )
+
+    async def save(self, path: Optional[Union[str, "os.PathLike[str]"]] = None) -> str:
+        """
+        Download the attachment straight to the disk.
+
+        :param path: Optional. The path of the file to write to. Defaults to the attachment's file name.
+        :return: The path of the written file.
+        """
+        return await self.__item.noticeboard.noticeboard.save_attachment(
+            self.__item.noticeboard.id,
+            self.__item.code,
+            self.__item.id,
+            path or self.filename,
+            self.num,
+        )
+
 
 class PartialNoticeboardItem:
     """
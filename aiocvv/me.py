@@ -3,13 +3,27 @@ This module contains the class that represents
 students, teachers and parents all together.
 """
 
+import os
+import asyncio
+from dataclasses import replace
 from datetime import datetime
 from io import BytesIO
-from typing import Optional
+from typing import (
+    Optional,
+    Union,
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    List,
+    Mapping,
+    Tuple,
+)
 from .enums import UserType, GradeCode, NoteType
-from .helpers import Noticeboard, Calendar
+from .helpers import Noticeboard, Calendar, Period
+from .response import Response
 from .dataclasses import School, MIURData, Subject, Teacher as TeacherT, Grade, Note
-from .utils import capitalize_name, group_by_date, parse_date
+from .utils import capitalize_name, parse_date
 
 
 class Me:
@@ -90,9 +104,18 @@ class Me:
         """The user's fiscal code."""
         return self.__card["fiscalCode"]
 
+    def _module(self):
+        # parents can request all of the students' endpoints
+        tp = self.type
+        if tp == UserType.parent:
+            tp = UserType.student
+
+        return getattr(self.client, tp.name + "s")
+
     async def refresh(self):
         """Refresh the user's data."""
-        self.__card = await getattr(self.client, self.type.name).get_card(self.id)
+        resp = await self._module().get_card(self.id)
+        self.__card = resp["content"]["card"]
 
     async def get_enabled_apps(self):
         """Get the enabled apps for the user."""
@@ -103,22 +126,32 @@ class Me:
         """
         Returns the user's avatar as a BytesIO object.
         """
-        resp = await self.client.request("GET", f"/users/{self.identity}/avatar")
-        ret = BytesIO(resp["content"])
+        ret = BytesIO()
+        async for chunk in self.client.stream("GET", f"/users/{self.identity}/avatar"):
+            ret.write(chunk)
+
+        ret.seek(0)
         ret.name = f"{self.identity}.jpg"
         return ret
 
+    async def save_avatar(
+        self, path: Optional[Union[str, "os.PathLike[str]"]] = None
+    ) -> str:
+        """
+        Save the user's avatar straight to the disk.
+
+        :param path: Optional. The path of the file to write to. Defaults to ``<identity>.jpg``.
+        :return: The path of the written file.
+        """
+        return await self.client.download(
+            f"/users/{self.identity}/avatar", path or f"{self.identity}.jpg"
+        )
+
     @property
     def noticeboard(self) -> Noticeboard:
         """The user's noticeboard."""
         if self.__noticeboard is None:
-            tp = self.type
-            if tp == UserType.parent:
-                tp = UserType.student
-
-            self.__noticeboard = Noticeboard(
-                self.id, getattr(self.client, tp.name + "s")
-            )
+            self.__noticeboard = Noticeboard(self._module().noticeboard, self.id)
 
         return self.__noticeboard
 
@@ -150,11 +183,16 @@ class Student(Me):
     def __init__(self, client, **kwargs):
         super().__init__(client, **kwargs)
         self.__calendar = None
+        # the parsed subjects and periods, along with what they've
+        # been parsed from and an index to look them up by
+        self.__reference: Dict[str, Tuple[Any, list, dict]] = {}
 
     @staticmethod
-    def _parse_grade(data, subjects, periods):
+    def _parse_grade(
+        data: dict, subjects: Mapping[int, Subject], periods: Mapping[int, Period]
+    ) -> Grade:
         return Grade(
-            subject=list(filter(lambda s: s.id == data["subjectId"], subjects))[0],
+            subject=subjects[data["subjectId"]],
             subject_code=data["subjectCode"],
             id=data["evtId"],
             code=GradeCode(data["evtCode"]),
@@ -166,7 +204,7 @@ class Student(Me):
             color=data["color"],
             canceled=data["canceled"],
             underlined=data["underlined"],
-            period=list(filter(lambda p: p.position == data["periodPos"], periods))[0],
+            period=periods[data["periodPos"]],
             component_position=data["componentPos"],
             component_description=data["componentDesc"],
             weight=data["weightFactor"],
@@ -189,6 +227,47 @@ class Student(Me):
             end=parse_date(data["evtEnd"]) if data.get("evtEnd") else None,
         )
 
+    @classmethod
+    def _parse_notes(cls, content: dict) -> List[Note]:
+        # every type has its own list, which may be missing if it's been filtered out
+        return [
+            cls._parse_note(note, type_)
+            for type_ in NoteType
+            for note in content.get(type_.value, [])
+        ]
+
+    def __parsed(
+        self,
+        name: str,
+        resp: Response,
+        parse: Callable[[Any], list],
+        key: Callable[[Any], Hashable],
+    ) -> Tuple[list, dict]:
+        # the response is parsed again only if it has changed since the last time
+        version = resp.etag or resp.body
+        parsed = self.__reference.get(name)
+        if parsed is None or parsed[0] != version:
+            items = parse(resp.content)
+            parsed = self.__reference[name] = (
+                version,
+                items,
+                {key(item): item for item in items},
+            )
+
+        return parsed[1], parsed[2]
+
+    async def refresh(self):
+        """
+        Refresh the user's data. The subjects and the periods will
+        also be parsed again on their next use, and the grades, the
+        notes and the absences of the periods fetched again.
+        """
+        self.__reference.clear()
+        if self.__calendar is not None:
+            self.__calendar._forget_partition()  # pylint: disable=protected-access
+
+        await super().refresh()
+
     @property
     def calendar(self) -> Calendar:
         """The user's calendar."""
@@ -197,38 +276,112 @@ class Student(Me):
 
         return self.__calendar
 
+    @staticmethod
+    def __parse_subjects(content: dict) -> List[Subject]:
+        return [
+            Subject(
+                teachers=[
+                    TeacherT(id=t["teacherId"], name=capitalize_name(t["teacherName"]))
+                    for t in subject.get("teachers", [])
+                ],
+                grades=None,
+                # the response may be cached in memory, so it must not be changed
+                **{k: v for k, v in subject.items() if k != "teachers"},
+            )
+            for subject in content["subjects"]
+        ]
+
     async def get_subjects(self, include_grades: bool = False) -> list[Subject]:
         """
         Get the user's subjects.
 
+        They're parsed only once, and shared by every helper
+        until the subjects change or :meth:`refresh` is called.
+
         :param include_grades: Whether to include the grades for each subject.
+                               They're all fetched at once, and then
+                               grouped by subject.
         :return: A list of the user's subjects.
         """
-        resp = await self.client.students.subjects(self.id)
-        resp = resp["content"]["subjects"]
+        if not include_grades:
+            subjects, _ = await self.__subjects()
+            return list(subjects)
+
+        # the subjects are fetched along with the grades, only once
+        resp, (subjects, periods) = await asyncio.gather(
+            self.client.students.grades(self.id), self._registries()
+        )
+        grades = {subject_id: [] for subject_id in subjects}
+        for data in resp["content"]["grades"]:
+            grade = self._parse_grade(data, subjects, periods)
+            grades[grade.subject.id].append(grade)
+
         return [
-            Subject(
-                teachers=[
-                    TeacherT(id=t["teacherId"], name=capitalize_name(t["teacherName"]))
-                    for t in subject.pop("teachers", [])
-                ],
-                grades=await self.get_grades(subject) if include_grades else None,
-                **subject,
-            )
-            for subject in resp
+            replace(subject, grades=grades[subject_id])
+            for subject_id, subject in subjects.items()
         ]
 
+    async def get_periods(self) -> List[Period]:
+        """
+        Get the periods of the student's school.
+
+        They're parsed only once, and shared by every helper
+        until the periods change or :meth:`refresh` is called.
+
+        :return: A list of :class:`~aiocvv.helpers.calendar.Period` objects.
+        """
+        periods, _ = await self.__periods()
+        return list(periods)
+
+    async def __subjects(self) -> Tuple[List[Subject], Dict[int, Subject]]:
+        resp = await self.client.students.subjects(self.id)
+        return self.__parsed(
+            "subjects", resp, self.__parse_subjects, lambda subject: subject.id
+        )
+
+    async def __periods(self) -> Tuple[List[Period], Dict[int, Period]]:
+        resp = await self.client.students.periods(self.id)
+        return self.__parsed(
+            "periods",
+            resp,
+            lambda content: [
+                Period(self.calendar, **period) for period in content["periods"]
+            ],
+            lambda period: period.position,
+        )
+
+    async def _subjects_by_id(self) -> Dict[int, Subject]:
+        """
+        Get the subjects by their ID, for the parsers
+        which don't need the periods.
+
+        :return: The subjects. They must not be changed.
+        """
+        _, subjects = await self.__subjects()
+        return subjects
+
+    async def _registries(self) -> Tuple[Dict[int, Subject], Dict[int, Period]]:
+        """
+        Get the subjects by their ID and the periods by their position,
+        which is how the parsers look them up.
+
+        :return: The subjects and the periods. They must not be changed.
+        """
+        (_, subjects), (_, periods) = await asyncio.gather(
+            self.__subjects(), self.__periods()
+        )
+        return subjects, periods
+
     async def get_grades(self, subject: Optional[Subject] = None) -> list[Grade]:
         """
         Get the user's grades.
 
         :param subject: The subject to get the grades from.
         """
-        resp = await self.client.students.grades(
-            self.id, subject.id if subject else None
+        resp, (subjects, periods) = await asyncio.gather(
+            self.client.students.grades(self.id, subject.id if subject else None),
+            self._registries(),
         )
-        periods = await self.calendar.get_periods()
-        subjects = await self.get_subjects()
         return [
             self._parse_grade(g, subjects, periods) for g in resp["content"]["grades"]
         ]
@@ -236,17 +389,8 @@ class Student(Me):
     async def get_notes(self, type: Optional[NoteType] = None) -> list[Note]:
         """Get the user's notes."""
 
-        resp = await self.client.students.notes(self.id, type.value if type else None)
-        resp = resp["content"]
-        notes = {}
-        for t in NoteType:
-            notes.update(group_by_date(resp[t.value], self._parse_note, t))
-
-        ret = []
-        for notess in notes.values():
-            ret += list(notess)
-
-        return ret
+        resp = await self.client.students.notes(self.id, type)
+        return self._parse_notes(resp["content"])
 
 
 class Parent(Student):
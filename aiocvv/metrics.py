@@ -0,0 +1,444 @@
+"""
+This module contains the Metrics class, which keeps track of what the client
+spends its time on: the requests sent, the cache, the logins and the retries.
+
+The requests are measured through an :class:`aiohttp.TraceConfig`, so only
+the ones actually sent over the network are counted, and each attempt
+of a retried request is counted on its own.
+"""
+
+import re
+import time
+from bisect import bisect_left
+from collections import Counter
+from types import SimpleNamespace
+from typing import Optional, Any, Dict, List, Sequence, Tuple
+from urllib.parse import urlsplit
+
+import aiohttp
+
+# in seconds, like the default buckets of the Prometheus clients,
+# with a couple more below them for the lookups in the cache
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+CACHE_RESULTS = ("hit", "stale", "not_modified", "expired", "miss")
+RETRY_REASONS = ("rate_limited", "server_error", "connection_error")
+
+_DATE = re.compile(r"^(19|20)\d{6}$")
+_IDENTITY = re.compile(r"^[A-Z]\d+[A-Z]?$")
+_HASH = re.compile(r"^[0-9a-fA-F]{16,}$")
+
+
+def endpoint_template(url: str) -> str:
+    """
+    Get the template of the endpoint of a URL, which is what the requests are
+    grouped by, so that every student, date and item doesn't get its own series.
+
+    The IDs become ``{id}``, the dates ``{date}``, the identities ``{ident}``
+    and the hashes of the documents ``{hash}``, and the part of the path
+    before ``rest/v1`` is left out:
+    ``students/{id}/overview/all/{date}/{date}``.
+
+    :param url: The URL of the request.
+    :return: The template.
+    """
+    segments = [s for s in urlsplit(str(url)).path.split("/") if s]
+    if "v1" in segments:
+        segments = segments[segments.index("v1") + 1 :]
+
+    ret = []
+    for segment in segments:
+        if _DATE.match(segment) or segment in ("today", "yesterday"):
+            segment = "{date}"
+        elif segment.isdigit():
+            segment = "{id}"
+        elif _IDENTITY.match(segment):
+            segment = "{ident}"
+        elif _HASH.match(segment):
+            segment = "{hash}"
+
+        ret.append(segment)
+
+    return "/".join(ret)
+
+
+class Histogram:
+    """
+    A histogram of durations, with cumulative buckets like Prometheus'.
+
+    :param buckets: Optional. The upper bounds of the buckets, in seconds.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.__counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        """
+        Record a value.
+
+        :param value: The value, in seconds.
+        """
+        self.__counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[float, int]]:
+        """
+        Get how many values are lower than or equal to each bucket's bound.
+
+        :return: The bounds with their counts, ending with infinity.
+        """
+        ret = []
+        total = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.__counts):
+            total += count
+            ret.append((bound, total))
+
+        return ret
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimate a quantile, by interpolating inside the bucket it falls in.
+
+        :param q: The quantile, between 0 and 1.
+        :return: The estimate, or None if nothing has been recorded.
+        """
+        if not self.count:
+            return None
+
+        rank = q * self.count
+        lower = 0.0
+        below = 0
+        for bound, total in self.cumulative():
+            if total >= rank:
+                if bound == float("inf"):
+                    # there's no upper bound to interpolate with
+                    return lower
+
+                inside = total - below
+                return lower + (bound - lower) * (rank - below) / (inside or 1)
+
+            lower, below = bound, total
+
+        return lower
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get the state of the histogram.
+
+        :return: The count and sum of the values, the estimated
+                 p50 and p99 and the cumulative buckets.
+        """
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "p50": self.quantile(0.5),
+            "p99": self.quantile(0.99),
+            "buckets": {
+                "+Inf" if bound == float("inf") else str(bound): total
+                for bound, total in self.cumulative()
+            },
+        }
+
+
+class Metrics:
+    """
+    The metrics of one client, or of every client of a
+    :class:`~aiocvv.pool.ClientPool`, which share the same ones.
+
+    * ``requests``: the requests sent, by method, endpoint template and status.
+      The requests which failed without a response have the ``error`` status;
+    * ``request_duration``: how long the server took to answer each request,
+      up to the headers of the response, by method and endpoint template;
+    * ``cache``: how the ``GET``, ``HEAD`` and ``OPTIONS`` requests have been answered:
+
+      * ``hit``, with a fresh cached response;
+      * ``stale``, with a stale one, which is revalidated in the background;
+      * ``not_modified``, with a stale one, after the server confirmed it's still valid;
+      * ``expired``, with a new response, since the cached one was outdated;
+      * ``miss``, with a new response, since nothing was cached;
+
+    * ``cache_lookup_duration``: how long looking a response up in the cache took;
+    * ``logins``: the logins, which have either ``succeeded``, ``failed`` or
+      been ``restored`` from the tokens kept on disk;
+    * ``login_duration``: how long the logins sent to the server took;
+    * ``bytes``: how many bytes have been ``received`` and ``sent``, bodies only;
+    * ``retries``: the requests sent again, because they've been ``rate_limited``
+      or because of a ``server_error`` or a ``connection_error``;
+    * ``coalesced``: the requests which shared the response of an identical one.
+
+    .. code-block:: python
+
+        async with ClassevivaClient("username", "password") as client:
+            await client.me.get_grades()
+            print(client.metrics.snapshot()["cache"])
+            print(client.metrics.prometheus())
+
+    :param buckets: Optional. The upper bounds of the buckets of the histograms, in seconds.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.requests: Counter = Counter()
+        self.request_duration: Dict[Tuple[str, str], Histogram] = {}
+        self.cache: Counter = Counter()
+        self.cache_lookup_duration = Histogram(self.buckets)
+        self.logins: Counter = Counter()
+        self.login_duration = Histogram(self.buckets)
+        self.bytes: Counter = Counter()
+        self.retries: Counter = Counter()
+        self.coalesced = 0
+
+    def reset(self):
+        """Forget everything recorded so far."""
+        self.__init__(self.buckets)
+
+    def record_request(
+        self, method: str, url: str, status: Any, duration: Optional[float] = None
+    ):
+        """
+        Record a request sent to the server.
+
+        :param method: The HTTP method.
+        :param url: The URL of the request.
+        :param status: The HTTP status of the response, or ``error`` if there was none.
+        :param duration: Optional. How long the server took to answer, in seconds.
+        """
+        key = (method.upper(), endpoint_template(url))
+        self.requests[key + (str(status),)] += 1
+        if duration is not None:
+            if key not in self.request_duration:
+                self.request_duration[key] = Histogram(self.buckets)
+
+            self.request_duration[key].observe(duration)
+
+    def record_cache(self, result: str, duration: Optional[float] = None):
+        """
+        Record how a ``GET``, ``HEAD`` or ``OPTIONS`` request has been answered.
+
+        :param result: One of ``hit``, ``stale``, ``not_modified``, ``expired`` and ``miss``.
+        :param duration: Optional. How long the lookup in the cache took, in seconds.
+        """
+        self.cache[result] += 1
+        if duration is not None:
+            self.cache_lookup_duration.observe(duration)
+
+    def record_login(self, result: str, duration: Optional[float] = None):
+        """
+        Record a login.
+
+        :param result: One of ``succeeded``, ``failed`` and ``restored``.
+        :param duration: Optional. How long the login request took, in seconds.
+        """
+        self.logins[result] += 1
+        if duration is not None:
+            self.login_duration.observe(duration)
+
+    def record_retry(self, reason: str):
+        """
+        Record a request that is going to be sent again.
+
+        :param reason: One of ``rate_limited``, ``server_error`` and ``connection_error``.
+        """
+        self.retries[reason] += 1
+
+    def record_coalesced(self):
+        """Record a request which shared the response of an identical one."""
+        self.coalesced += 1
+
+    async def __on_request_start(self, _, ctx: SimpleNamespace, __):
+        ctx.metrics_start = time.perf_counter()
+
+    async def __on_request_end(
+        self, _, ctx: SimpleNamespace, params: aiohttp.TraceRequestEndParams
+    ):
+        self.record_request(
+            params.method,
+            params.url,
+            params.response.status,
+            time.perf_counter() - ctx.metrics_start,
+        )
+
+    async def __on_request_exception(
+        self, _, ctx: SimpleNamespace, params: aiohttp.TraceRequestExceptionParams
+    ):
+        self.record_request(
+            params.method,
+            params.url,
+            "error",
+            time.perf_counter() - ctx.metrics_start,
+        )
+
+    async def __on_chunk_sent(self, _, __, params: aiohttp.TraceRequestChunkSentParams):
+        self.bytes["sent"] += len(params.chunk)
+
+    async def __on_chunk_received(
+        self, _, __, params: aiohttp.TraceResponseChunkReceivedParams
+    ):
+        self.bytes["received"] += len(params.chunk)
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        """
+        Get a trace config recording the requests made by an
+        :class:`aiohttp.ClientSession` into these metrics.
+
+        The sessions created by the client already use one, so this is only
+        needed for a session given to the client, if it should be measured.
+
+        :return: The trace config.
+        """
+        config = aiohttp.TraceConfig()
+        config.on_request_start.append(self.__on_request_start)
+        config.on_request_end.append(self.__on_request_end)
+        config.on_request_exception.append(self.__on_request_exception)
+        config.on_request_chunk_sent.append(self.__on_chunk_sent)
+        config.on_response_chunk_received.append(self.__on_chunk_received)
+        return config
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get everything recorded so far.
+
+        The requests and their durations are keyed by ``"<method> <template>"``,
+        and ``hit_ratio`` is the share of the ``GET``, ``HEAD`` and ``OPTIONS``
+        requests that have been answered without waiting for the server.
+
+        :return: A dictionary of the metrics.
+        """
+        requests: Dict[str, Dict[str, int]] = {}
+        for (method, template, status), count in sorted(self.requests.items()):
+            requests.setdefault(f"{method} {template}", {})[status] = count
+
+        cacheable = sum(self.cache.values())
+        served = self.cache["hit"] + self.cache["stale"]
+        return {
+            "requests": requests,
+            "request_duration": {
+                f"{method} {template}": histogram.snapshot()
+                for (method, template), histogram in sorted(
+                    self.request_duration.items()
+                )
+            },
+            "cache": {
+                **{result: self.cache[result] for result in CACHE_RESULTS},
+                "hit_ratio": served / cacheable if cacheable else None,
+                "lookup_duration": self.cache_lookup_duration.snapshot(),
+            },
+            "logins": {
+                **{r: self.logins[r] for r in ("succeeded", "failed", "restored")},
+                "duration": self.login_duration.snapshot(),
+            },
+            "bytes": {"received": self.bytes["received"], "sent": self.bytes["sent"]},
+            "retries": {reason: self.retries[reason] for reason in RETRY_REASONS},
+            "coalesced": self.coalesced,
+        }
+
+    @staticmethod
+    def __labels(**labels: Any) -> str:
+        if not labels:
+            return ""
+
+        escaped = (
+            (k, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+            for k, v in labels.items()
+        )
+        return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+    def __histogram(
+        self, lines: List[str], name: str, histogram: Histogram, **labels: Any
+    ):
+        for bound, total in histogram.cumulative():
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f"{name}_bucket{self.__labels(**labels, le=le)} {total}")
+
+        lines.append(f"{name}_sum{self.__labels(**labels)} {histogram.sum!r}")
+        lines.append(f"{name}_count{self.__labels(**labels)} {histogram.count}")
+
+    def prometheus(self, prefix: str = "aiocvv") -> str:
+        """
+        Export the metrics in the text format of Prometheus.
+
+        :param prefix: Optional. The prefix of the name of every metric.
+        :return: The exposition text.
+        """
+        lines = []
+
+        def header(name: str, kind: str, description: str):
+            lines.append(f"# HELP {prefix}_{name} {description}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+
+        header("requests_total", "counter", "Requests sent to the server.")
+        for (method, template, status), count in sorted(self.requests.items()):
+            labels = self.__labels(method=method, endpoint=template, status=status)
+            lines.append(f"{prefix}_requests_total{labels} {count}")
+
+        header(
+            "request_duration_seconds",
+            "histogram",
+            "Time until the server answered a request.",
+        )
+        for (method, template), histogram in sorted(self.request_duration.items()):
+            self.__histogram(
+                lines,
+                f"{prefix}_request_duration_seconds",
+                histogram,
+                method=method,
+                endpoint=template,
+            )
+
+        header("cache_requests_total", "counter", "Safe requests, by cache outcome.")
+        for result in CACHE_RESULTS:
+            labels = self.__labels(result=result)
+            lines.append(f"{prefix}_cache_requests_total{labels} {self.cache[result]}")
+
+        header(
+            "cache_lookup_duration_seconds",
+            "histogram",
+            "Time spent looking responses up in the cache.",
+        )
+        self.__histogram(
+            lines, f"{prefix}_cache_lookup_duration_seconds", self.cache_lookup_duration
+        )
+
+        header("logins_total", "counter", "Logins, by outcome.")
+        for result in ("succeeded", "failed", "restored"):
+            labels = self.__labels(result=result)
+            lines.append(f"{prefix}_logins_total{labels} {self.logins[result]}")
+
+        header("login_duration_seconds", "histogram", "Time spent logging in.")
+        self.__histogram(lines, f"{prefix}_login_duration_seconds", self.login_duration)
+
+        header("received_bytes_total", "counter", "Bytes of the response bodies.")
+        lines.append(f"{prefix}_received_bytes_total {self.bytes['received']}")
+        header("sent_bytes_total", "counter", "Bytes of the request bodies.")
+        lines.append(f"{prefix}_sent_bytes_total {self.bytes['sent']}")
+
+        header("retries_total", "counter", "Requests sent again, by reason.")
+        for reason in RETRY_REASONS:
+            labels = self.__labels(reason=reason)
+            lines.append(f"{prefix}_retries_total{labels} {self.retries[reason]}")
+
+        header(
+            "coalesced_requests_total",
+            "counter",
+            "Requests which shared the response of an identical one.",
+        )
+        lines.append(f"{prefix}_coalesced_requests_total {self.coalesced}")
+        return "\n".join(lines) + "\n"
@@ -5,12 +5,19 @@ This module contains the base classes for the students, parents and teachers mod
 import os
 from abc import ABC
 from types import SimpleNamespace
-from typing import Optional, Mapping, Any, Iterable, Union, IO, TYPE_CHECKING
+from typing import (
+    Optional,
+    Mapping,
+    Any,
+    Iterable,
+    Union,
+    IO,
+    AsyncIterator,
+    TYPE_CHECKING,
+)
 from io import BytesIO, StringIO
-from base64 import b64encode
 from urllib.parse import urljoin
 
-from diskcache import Cache
 from aiohttp.client import (
     Fingerprint,
     ClientTimeout,
@@ -19,6 +26,8 @@ from aiohttp.client import (
 from aiohttp.helpers import sentinel
 from aiohttp.typedefs import StrOrURL, LooseCookies, LooseHeaders
 from ..types import Response
+from ..backends import CacheBackend
+from ..utils import stream_json_with_file
 
 
 class Noticeboard:
@@ -81,12 +90,12 @@ class Noticeboard:
             json={"join": False},
         )
 
-    async def __pre_join(
+    def __pre_join(
         self,
         *,
         text: Optional[str] = None,
         filename: Optional[str] = None,
-        file: Optional[IO[Any]] = None,
+        file: Optional[Union[IO[Any], str, "os.PathLike[str]"]] = None,
         sign: Optional[bool] = None,
         attrs: bool = True,
         include_attachment: bool = False,
@@ -97,26 +106,30 @@ class Noticeboard:
         if text:
             payload["text"] = text
 
+        if sign:
+            payload["sign"] = sign
+
         if file:
             if isinstance(file, (BytesIO, StringIO)):
-                cont = file.getvalue()
-            else:
-                cont = file.read()
-
-            if not filename and not file.name:
+                file.seek(0)
+
+            name = (
+                getattr(file, "name", None)
+                if hasattr(file, "read")
+                else os.fspath(file)
+            ) or filename
+            if not name:
                 raise ValueError("a file name must be specified")
 
-            payload["file"] = await self.module.client.loop.run_in_executor(
-                None, lambda: b64encode(cont).decode("utf-8")
-            )
-            payload["filename"] = os.path.basename(
-                getattr(file, "name", None) or filename
-            )
+            payload["filename"] = os.path.basename(name)
+            # the file is encoded and sent a chunk at a time
+            return flags, {
+                "data": stream_json_with_file(
+                    payload, "file", file, loop=self.module.client.loop
+                )
+            }
 
-        if sign:
-            payload["sign"] = sign
-
-        return flags, payload
+        return flags, {"json": payload}
 
     async def join(
         self,
@@ -125,7 +138,7 @@ class Noticeboard:
         publication_id: int,
         *,
         text: Optional[str] = None,
-        file: Optional[IO[Any]] = None,
+        file: Optional[Union[IO[Any], str, "os.PathLike[str]"]] = None,
         filename: Optional[str] = None,
         sign: Optional[bool] = None,
         attrs: bool = True,
@@ -143,7 +156,8 @@ class Noticeboard:
         :param event_code: The code of the notice.
         :param publication_id: The ID itself of the notice.
         :param text: Optional. The text to join with.
-        :param file: Optional. The file object to join with.
+        :param file: Optional. The file object or the path of the file to join with.
+                     It's read, encoded and sent a chunk at a time.
         :param filename: Optional. The name of the file to join with.
         :param sign: Optional. Whether to sign the join.
         :param attrs: Optional. Whether to include attributes.
@@ -156,7 +170,7 @@ class Noticeboard:
         :return: The response from the API.
         """
 
-        flags, payload = await self.__pre_join(
+        flags, body = self.__pre_join(
             text=text,
             filename=filename,
             file=file,
@@ -169,7 +183,7 @@ class Noticeboard:
         return await self.module.request(
             "POST",
             f"/{id}/noticeboard/read{multi}/{event_code}/{publication_id}/{flags}",
-            json=payload,
+            **body,
         )
 
     async def get_attachment(
@@ -195,6 +209,58 @@ class Noticeboard:
             f"/{id}/noticeboard/attach/{event_code}/{publication_id}/{attach_num}",
         )
 
+    def stream_attachment(
+        self,
+        id: int,  # pylint: disable=redefined-builtin
+        event_code: int,
+        publication_id: int,
+        attach_num: int = 1,
+        *,
+        chunk_size: int = 64 * 1024,
+    ) -> AsyncIterator[bytes]:
+        """
+        Get an attachment from a noticeboard item, in chunks as it's received.
+
+        :param id: The ID of the student/teacher.
+        :param event_code: The code of the notice.
+        :param publication_id: The ID itself of the notice.
+        :param attach_num: Optional. The attachment number.
+        :param chunk_size: Optional. The maximum size of each chunk, in bytes.
+
+        :return: An asynchronous iterator of the chunks of the attachment.
+        """
+
+        return self.module.stream(
+            "GET",
+            f"/{id}/noticeboard/attach/{event_code}/{publication_id}/{attach_num}",
+            chunk_size=chunk_size,
+        )
+
+    async def save_attachment(
+        self,
+        id: int,  # pylint: disable=redefined-builtin
+        event_code: int,
+        publication_id: int,
+        path: Union[str, "os.PathLike[str]"],
+        attach_num: int = 1,
+    ) -> str:
+        """
+        Download an attachment from a noticeboard item straight to the disk.
+
+        :param id: The ID of the student/teacher.
+        :param event_code: The code of the notice.
+        :param publication_id: The ID itself of the notice.
+        :param path: The path of the file to write to.
+        :param attach_num: Optional. The attachment number.
+
+        :return: The path of the written file.
+        """
+
+        return await self.module.download(
+            f"/{id}/noticeboard/attach/{event_code}/{publication_id}/{attach_num}",
+            path,
+        )
+
 
 class Module(ABC):
     """
@@ -217,8 +283,13 @@ class Module(ABC):
 
             self.client: ClassevivaClient = client
 
-    def get_cache(self) -> Cache:
-        return Cache(self.client._cache_path)  # pylint: disable=protected-access
+    def get_cache(self) -> CacheBackend:
+        """
+        Get the backend the client stores its cache in.
+
+        :return: The cache backend. See :mod:`aiocvv.backends`.
+        """
+        return self.client.cache_backend
 
     async def request(
         self,
@@ -316,10 +387,7 @@ class Module(ABC):
         """
         return await self.client.request(
             method,
-            urljoin(
-                self.endpoint.strip("/") + "/",
-                endpoint.lstrip("/"),
-            ),
+            self._path(endpoint),
             params=params,
             data=data,
             json=json,
@@ -341,6 +409,75 @@ class Module(ABC):
             read_bufsize=read_bufsize,
         )
 
+    def _path(self, endpoint: str) -> str:
+        return urljoin(self.endpoint.strip("/") + "/", endpoint.lstrip("/"))
+
+    def stream(
+        self,
+        method: str,
+        endpoint: str,
+        *,
+        params: Optional[Mapping[str, str]] = None,
+        json: Any = None,
+        headers: Optional[LooseHeaders] = None,
+        chunk_size: int = 64 * 1024,
+        raise_for_status: bool = True,
+    ) -> AsyncIterator[bytes]:
+        """
+        Make a raw HTTP request to the Classeviva REST APIs,
+        yielding the body of the response in chunks as it's received.
+
+        This function calls :meth:`ClassevivaClient.stream` to make the
+        request itself, the only difference is that the request will be
+        forced to be inside the module. See :meth:`request` for more information.
+
+        :param method: The HTTP method to use.
+        :param endpoint: The path for the request, relative to the module.
+        :param params: Optional. The query parameters for the request.
+        :param json: Optional. The request body JSON data.
+        :param headers: Optional. The headers to include in the request.
+        :param chunk_size: Optional. The maximum size of each chunk, in bytes.
+        :param raise_for_status: Optional. Whether to raise an exception
+                                 for non-successful responses.
+
+        :return: An asynchronous iterator of the chunks of the body.
+        """
+        return self.client.stream(
+            method,
+            self._path(endpoint),
+            params=params,
+            json=json,
+            headers=headers,
+            chunk_size=chunk_size,
+            raise_for_status=raise_for_status,
+        )
+
+    async def download(
+        self,
+        endpoint: str,
+        path: Union[str, "os.PathLike[str]"],
+        *,
+        params: Optional[Mapping[str, str]] = None,
+        chunk_size: int = 64 * 1024,
+    ) -> str:
+        """
+        Download a file from the Classeviva REST APIs straight to the disk.
+
+        This function calls :meth:`ClassevivaClient.download` to make the
+        request itself, the only difference is that the request will be
+        forced to be inside the module. See :meth:`request` for more information.
+
+        :param endpoint: The path for the request, relative to the module.
+        :param path: The path of the file to write to.
+        :param params: Optional. The query parameters for the request.
+        :param chunk_size: Optional. The maximum size of each chunk, in bytes.
+
+        :return: The path of the written file.
+        """
+        return await self.client.download(
+            self._path(endpoint), path, params=params, chunk_size=chunk_size
+        )
+
 
 class BaseModule(Module, ABC):
     """
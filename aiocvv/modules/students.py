@@ -5,14 +5,13 @@ It can be used by students and parents, and not by teachers.
 
 import os
 from datetime import datetime, date
-from typing import Optional, Any, IO
+from typing import Optional, Any, IO, Union, AsyncIterator
 from urllib.parse import urljoin
 from io import BytesIO, StringIO
-from base64 import b64encode
 from .core import BaseModule
 from ..enums import EventCode, NoteType
 from ..types import Date, Response
-from ..utils import convert_date
+from ..utils import convert_date, stream_json_with_file
 
 
 class StudentHomeworks:
@@ -52,6 +51,52 @@ class StudentHomeworks:
             f"/{student_id}/homeworks/downloadTeacherFile/{event_code}/{file_id}",
         )
 
+    def stream_teacher_file(
+        self,
+        student_id: int,
+        event_code: str,
+        file_id: int,
+        *,
+        chunk_size: int = 64 * 1024,
+    ) -> AsyncIterator[bytes]:
+        """
+        Downloads a teacher file associated with a specific homework, in chunks as it's received.
+
+        :param student_id: The ID of the student.
+        :param event_code: The event code of the homework.
+        :param file_id: The ID of the file.
+        :param chunk_size: Optional. The maximum size of each chunk, in bytes.
+        :return: An asynchronous iterator of the chunks of the file.
+        """
+
+        return self.module.stream(
+            "GET",
+            f"/{student_id}/homeworks/downloadTeacherFile/{event_code}/{file_id}",
+            chunk_size=chunk_size,
+        )
+
+    async def save_teacher_file(
+        self,
+        student_id: int,
+        event_code: str,
+        file_id: int,
+        path: Union[str, "os.PathLike[str]"],
+    ) -> str:
+        """
+        Downloads a teacher file associated with a specific homework straight to the disk.
+
+        :param student_id: The ID of the student.
+        :param event_code: The event code of the homework.
+        :param file_id: The ID of the file.
+        :param path: The path of the file to write to.
+        :return: The path of the written file.
+        """
+
+        return await self.module.download(
+            f"/{student_id}/homeworks/downloadTeacherFile/{event_code}/{file_id}",
+            path,
+        )
+
     async def insert_student_msg(
         self, student_id: int, event_code: str, homework_id: int, message: str
     ) -> Response:
@@ -77,38 +122,42 @@ class StudentHomeworks:
         student_id: int,
         event_code: str,
         homework_id: int,
-        file: IO[Any],
+        file: Union[IO[Any], str, "os.PathLike[str]"],
         filename: Optional[str] = None,
     ) -> Response:
         """
         Uploads a file from the student for a specific homework.
 
+        The file is read, encoded and sent a chunk at a time,
+        so it's never held in memory all at once.
+
         :param student_id: The ID of the student.
         :param event_code: The event code of the homework.
         :param homework_id: The ID of the homework.
-        :param file: The file to upload.
+        :param file: The file object or the path of the file to upload.
         :param filename: The name of the file (optional).
         :return: The response from the Classeviva API.
         :rtype: dict
         """
 
-        payload = {}
         if isinstance(file, (BytesIO, StringIO)):
-            cont = file.getvalue()
-        else:
-            cont = file.read()
+            file.seek(0)
 
-        if not filename and not file.name:
+        name = (
+            getattr(file, "name", None) if hasattr(file, "read") else os.fspath(file)
+        ) or filename
+        if not name:
             raise ValueError("a file name must be specified")
 
-        payload["file"] = await self.module.client.loop.run_in_executor(
-            None, lambda: b64encode(cont).decode("utf-8")
-        )
-        payload["filename"] = os.path.basename(getattr(file, "name", None) or filename)
         return await self.module.request(
             "POST",
             f"/{student_id}/homeworks/uploadStudentFile/{event_code}/{homework_id}",
-            json=payload,
+            data=stream_json_with_file(
+                {"filename": os.path.basename(name)},
+                "file",
+                file,
+                loop=self.module.client.loop,
+            ),
         )
 
     async def set_teacher_msg_status(
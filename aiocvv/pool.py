@@ -0,0 +1,296 @@
+"""
+This module contains the ClientPool class, which is used
+to make requests for many accounts at once.
+"""
+
+import os
+import asyncio
+from typing import (
+    Optional,
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    TypeVar,
+)
+
+import aiohttp
+from appdirs import user_cache_dir
+from typing_extensions import Self
+from .client import ClassevivaClient, LoginMethods
+from .cache import ResponseCache
+from .backends import CacheBackend, DiskCacheBackend
+from .ratelimit import RateLimiter
+from .retry import CircuitBreaker
+from .metrics import Metrics
+from .utils import gather_bounded
+from ._auth import TokenStore
+
+T = TypeVar("T")
+
+
+class ClientPool:
+    """
+    A pool of clients, one for each account, which share the same HTTP
+    connections, the same tokens and the same cache of responses.
+
+    Creating a client in a pool costs almost nothing, so thousands of accounts
+    can be synced at once without being slowed down by each client's setup.
+
+    .. code-block:: python
+
+        async def sync(client):
+            return await client.me.get_grades()
+
+        async with ClientPool(concurrency=200) as pool:
+            grades = await pool.map(sync, [("user1", "pass1"), ("user2", "pass2")])
+
+    :param loop: Optional. The event loop to use.
+                 If not provided, the default event loop will be used.
+    :param base_url: Optional. The base URL for the Classeviva REST APIs.
+    :param concurrency: Optional. How many accounts :meth:`map` works on at once.
+    :param per_account_concurrency: Optional. How many requests each
+                                    account can have in flight at once.
+    :param connector_limit: Optional. The maximum number of simultaneous
+                            connections, shared by every account.
+    :param connector_limit_per_host: Optional. The maximum number of simultaneous
+                                     connections to the same host. 0 means no limit.
+    :param keepalive_timeout: Optional. How many seconds an idle connection
+                              is kept open to be reused by the next requests.
+    :param dns_cache_ttl: Optional. How many seconds resolved host names are cached.
+                          None disables the DNS cache.
+    :param memory_cache_size: Optional. How many responses are kept in memory,
+                              on top of the ones cached on disk.
+    :param memory_cache_bytes: Optional. The maximum size in bytes of the responses
+                               kept in memory. None means there is no limit
+                               other than ``memory_cache_size``.
+    :param disk_cache_bytes: Optional. The maximum size in bytes of the on-disk cache.
+                             Ignored if ``cache_backend`` is given.
+    :param cache_eviction: Optional. Which cached responses are evicted first when a
+                           limit is reached: the least recently used ones (``lru``)
+                           or the least frequently used ones (``lfu``).
+    :param cache_backend: Optional. Where the cache is stored, which is
+                          on disk by default. See :mod:`aiocvv.backends`.
+                          It's not closed by :meth:`close`.
+    :param persist_tokens: Optional. Whether to keep the tokens on disk. This is off by
+                           default, since looking them up means hashing every password.
+    :param metrics: Optional. Where the metrics of every client of the pool are recorded.
+                    See :class:`~aiocvv.metrics.Metrics`.
+    :param client_options: Optional. Any other argument to pass
+                           to every :class:`~aiocvv.client.ClassevivaClient`.
+
+    :type loop: asyncio.AbstractEventLoop
+    :type base_url: str
+    :type concurrency: int
+    :type per_account_concurrency: Optional[int]
+    :type connector_limit: int
+    :type connector_limit_per_host: int
+    :type keepalive_timeout: float
+    :type dns_cache_ttl: Optional[int]
+    :type memory_cache_size: int
+    :type memory_cache_bytes: Optional[int]
+    :type disk_cache_bytes: int
+    :type cache_eviction: str
+    :type cache_backend: Optional[CacheBackend]
+    :type persist_tokens: bool
+    :type metrics: Optional[Metrics]
+    """
+
+    def __init__(
+        self,
+        *,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+        base_url: str = "https://web.spaggiari.eu/rest/v1/",
+        concurrency: int = 100,
+        per_account_concurrency: Optional[int] = 4,
+        connector_limit: int = 100,
+        connector_limit_per_host: int = 0,
+        keepalive_timeout: float = 30.0,
+        dns_cache_ttl: Optional[int] = 300,
+        memory_cache_size: int = 4096,
+        memory_cache_bytes: Optional[int] = None,
+        disk_cache_bytes: int = 2**30,
+        cache_eviction: str = "lru",
+        cache_backend: Optional[CacheBackend] = None,
+        persist_tokens: bool = False,
+        metrics: Optional[Metrics] = None,
+        **client_options: Any,
+    ):
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+
+        self.loop = loop or asyncio.get_event_loop()
+        self.base_url = base_url
+        self.concurrency = concurrency
+        self.per_account_concurrency = per_account_concurrency
+        self.__client_options = client_options
+        self.__client_options["persist_tokens"] = persist_tokens
+        self.__connector_options = {
+            "limit": connector_limit,
+            "limit_per_host": connector_limit_per_host,
+            "keepalive_timeout": keepalive_timeout,
+            "use_dns_cache": dns_cache_ttl is not None,
+            "ttl_dns_cache": dns_cache_ttl,
+        }
+        self.__session: Optional[aiohttp.ClientSession] = None
+        self.metrics = metrics or Metrics()
+        self.cache_backend = cache_backend or DiskCacheBackend(
+            os.path.join(user_cache_dir(), "aiocvv"),
+            size_limit=disk_cache_bytes,
+            eviction=cache_eviction,
+            loop=self.loop,
+        )
+        self.__owns_backend = cache_backend is None
+        self.__responses = ResponseCache(
+            self.cache_backend,
+            maxsize=memory_cache_size,
+            max_bytes=memory_cache_bytes,
+            eviction=cache_eviction,
+        )
+        self.__tokens = TokenStore()
+        self.__limiters: Dict[str, RateLimiter] = {}
+        self.__breakers: Dict[str, CircuitBreaker] = {}
+        self.__clients: Dict[str, ClassevivaClient] = {}
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """
+        The HTTP session shared by every client of the pool.
+
+        It's created on first use and re-created if it has been closed.
+
+        :return: The session instance.
+        """
+        if self.__session is None or self.__session.closed:
+            self.__session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(**self.__connector_options),
+                trace_configs=[self.metrics.trace_config()],
+            )
+
+        return self.__session
+
+    @property
+    def closed(self) -> bool:
+        """Whether the pool's HTTP session is closed."""
+        return self.__session is None or self.__session.closed
+
+    def client(
+        self, username: str, password: str, identity: Optional[str] = None
+    ) -> ClassevivaClient:
+        """
+        Get the client of an account, creating it if it's not in the pool yet.
+
+        .. note::
+            This must be called while the event loop is running,
+            since the shared session might have to be created.
+
+        :param username: The username for authentication.
+        :param password: The password for authentication.
+        :param identity: Optional. The identity for authentication.
+        :return: The client.
+        """
+        key = TokenStore.key(self.base_url, username, identity)
+        if key not in self.__clients:
+            self.__clients[key] = ClassevivaClient(
+                username,
+                password,
+                identity,
+                loop=self.loop,
+                base_url=self.base_url,
+                max_concurrency=self.per_account_concurrency,
+                session=self.session,
+                token_store=self.__tokens,
+                cache_backend=self.cache_backend,
+                response_cache=self.__responses,
+                rate_limiters=self.__limiters,
+                circuit_breakers=self.__breakers,
+                metrics=self.metrics,
+                **self.__client_options,
+            )
+
+        return self.__clients[key]
+
+    def __len__(self) -> int:
+        return len(self.__clients)
+
+    def __iter__(self) -> Iterator[ClassevivaClient]:
+        return iter(list(self.__clients.values()))
+
+    async def __run(
+        self,
+        fn: Callable[[ClassevivaClient], Awaitable[T]],
+        account: LoginMethods,
+        login: bool,
+    ) -> T:
+        client = self.client(*account)
+        if login and client.me is None:
+            await client.login()
+
+        return await fn(client)
+
+    async def map(
+        self,
+        fn: Callable[[ClassevivaClient], Awaitable[T]],
+        accounts: Iterable[LoginMethods],
+        *,
+        login: bool = True,
+        return_exceptions: bool = False,
+    ) -> List[Any]:
+        """
+        Call a coroutine function with the client of every given account,
+        working on at most :attr:`concurrency` accounts at once.
+
+        :param fn: The coroutine function to call with each client.
+        :param accounts: The accounts, as ``(username, password)``
+                         or ``(username, password, identity)`` tuples.
+        :param login: Optional. Whether to log in before calling the function,
+                      if the client hasn't already.
+        :param return_exceptions: Optional. Whether to return the exceptions raised
+                                  for an account in its place instead of raising
+                                  the first one and cancelling the others.
+        :return: What the function returned for each account, in the same order.
+        """
+        return await gather_bounded(
+            lambda account: self.__run(fn, account, login),
+            accounts,
+            self.concurrency,
+            return_exceptions,
+        )
+
+    async def cache_usage(self, backend: bool = True) -> Dict[str, Any]:
+        """
+        Get how much space the responses cached by the pool are taking,
+        in memory and in the backend, in total and by endpoint family.
+
+        See :meth:`aiocvv.cache.ResponseCache.usage`.
+
+        :param backend: Optional. Whether to include the backend.
+        :return: The usage of the cache.
+        """
+        return await self.__responses.usage(backend)
+
+    async def close(self):
+        """
+        Close the shared HTTP session and the cache backend, unless it's been given.
+
+        The clients are removed from the pool, but their tokens are kept,
+        so the pool can still be used afterwards without logging in again.
+        """
+        clients = list(self.__clients.values())
+        self.__clients.clear()
+        await asyncio.gather(*(client.close() for client in clients))
+        if self.__session is not None and not self.__session.closed:
+            await self.__session.close()
+
+        self.__session = None
+        if self.__owns_backend:
+            await self.cache_backend.close()
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
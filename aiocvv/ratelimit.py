@@ -0,0 +1,114 @@
+"""
+This module contains the rate limiter used by the client to
+avoid hitting the rate limits of the Classeviva API.
+"""
+
+import asyncio
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse the value of a ``Retry-After`` header.
+
+    :param value: The header value, either a number of seconds or an HTTP date.
+    :return: How many seconds to wait, or None if the value is missing or invalid.
+    """
+    if not value:
+        return None
+
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+
+    return max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class RateLimiter:
+    """
+    A token bucket rate limiter.
+
+    The bucket holds up to ``burst`` tokens and is refilled at ``rate`` tokens
+    per second. Every request takes a token, waiting for one if the bucket is empty.
+    Waiting requests are let through in the same order they arrived.
+
+    :param rate: Optional. How many requests per second can be made on average.
+                 None means there is no limit, but the limiter can still be paused.
+    :param burst: Optional. How many requests can be made at once.
+    """
+
+    def __init__(self, rate: Optional[float] = None, burst: int = 1):
+        if rate is not None and rate <= 0:
+            raise ValueError("rate must be greater than 0")
+
+        if burst < 1:
+            raise ValueError("burst must be at least 1")
+
+        self.rate = rate
+        self.burst = burst
+        self.__tokens = float(burst)
+        self.__updated = time.monotonic()
+        self.__paused_until = 0.0
+        self.__lock: Optional[asyncio.Lock] = None
+
+    def __refill(self, now: float):
+        if now <= self.__updated:
+            return
+
+        if self.rate is not None:
+            self.__tokens = min(
+                self.burst, self.__tokens + (now - self.__updated) * self.rate
+            )
+
+        self.__updated = now
+
+    @property
+    def paused(self) -> bool:
+        """Whether the limiter is currently holding every request back."""
+        return time.monotonic() < self.__paused_until
+
+    async def acquire(self):
+        """Wait until a request can be made."""
+        if self.__lock is None:
+            self.__lock = asyncio.Lock()
+
+        async with self.__lock:
+            while True:
+                now = time.monotonic()
+                if now < self.__paused_until:
+                    await asyncio.sleep(self.__paused_until - now)
+                    continue
+
+                self.__refill(now)
+                if self.rate is None:
+                    return
+
+                if self.__tokens >= 1:
+                    self.__tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self.__tokens) / self.rate)
+
+    def pause(self, seconds: float):
+        """
+        Hold every request back for the given amount of time.
+        This is used when the server replies with 429 Too Many Requests.
+
+        :param seconds: How many seconds to wait for.
+        """
+        self.__paused_until = max(self.__paused_until, time.monotonic() + seconds)
+        # start refilling from empty once the pause is over
+        self.__tokens = 0.0
+        self.__updated = self.__paused_until
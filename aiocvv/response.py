@@ -0,0 +1,134 @@
+"""
+This module contains the Response class, which holds
+the responses from the Classeviva API.
+"""
+
+from typing import Any, Iterator, Mapping, Optional
+
+from .codec import JSONLoads, decode_body, get_loads
+
+# the only headers the library looks at
+KEPT_HEADERS = ("ETag", "Z-Cache-Control", "Date")
+
+_KEYS = ("created_at", "content", "headers", "status", "status_reason")
+_MISSING = object()
+
+
+class Response(Mapping[str, Any]):
+    """
+    A response from the Classeviva API.
+
+    It can be used like the dictionary it used to be, with the ``created_at``,
+    ``content``, ``headers``, ``status``, ``status_reason`` and (if the server
+    sent one) ``etag`` keys, and also through the attributes of the same name.
+
+    Only the raw body is kept until :attr:`content` is first accessed, and it's
+    the only thing that's stored when the response is pickled into the cache.
+
+    :param created_at: When the response has been received, as a UNIX timestamp.
+    :param body: The raw body of the response.
+    :param headers: The headers of the response. Only ``ETag``,
+                    ``Z-Cache-Control`` and ``Date`` are kept.
+    :param status: The HTTP status code.
+    :param status_reason: The HTTP status reason.
+    :param loads: Optional. The function used to parse the body, if it's JSON.
+    """
+
+    __slots__ = (
+        "created_at",
+        "headers",
+        "status",
+        "status_reason",
+        "content_type",
+        "_body",
+        "_content",
+        "_loads",
+    )
+
+    def __init__(
+        self,
+        created_at: float,
+        body: bytes,
+        headers: Mapping[str, str],
+        status: int,
+        status_reason: Optional[str],
+        loads: Optional[JSONLoads] = None,
+    ):
+        self.created_at = created_at
+        self.status = status
+        self.status_reason = status_reason
+        lower = {k.lower(): v for k, v in headers.items()}
+        self.content_type: str = lower.get("content-type", "")
+        self.headers = {k: lower[k.lower()] for k in KEPT_HEADERS if k.lower() in lower}
+
+        self._body = body
+        self._content: Any = _MISSING
+        self._loads = loads
+
+    @property
+    def content(self) -> Any:
+        """
+        The body of the response: the parsed JSON document if it's JSON,
+        its text if it's text and the raw bytes otherwise.
+        It's decoded on first access.
+        """
+        if self._content is _MISSING:
+            self._content = decode_body(
+                self._body, self.content_type, self._loads or get_loads()
+            )
+
+        return self._content
+
+    @property
+    def body(self) -> bytes:
+        """The raw body of the response."""
+        return self._body
+
+    @property
+    def etag(self) -> Optional[str]:
+        """The ``ETag`` of the response, if any."""
+        return self.headers.get("ETag")
+
+    def __keys(self):
+        return _KEYS + (("etag",) if "ETag" in self.headers else ())
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.__keys():
+            raise KeyError(key)
+
+        return getattr(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.__keys())
+
+    def __len__(self) -> int:
+        return len(self.__keys())
+
+    def __getstate__(self):
+        # the decoded content and the parser are never pickled
+        return (
+            self.created_at,
+            self._body,
+            self.headers,
+            self.status,
+            self.status_reason,
+            self.content_type,
+        )
+
+    def __setstate__(self, state):
+        (
+            self.created_at,
+            self._body,
+            self.headers,
+            self.status,
+            self.status_reason,
+            self.content_type,
+        ) = state
+        self._content = _MISSING
+        self._loads = None
+
+    def __repr__(self) -> str:
+        return (
+            f"<{type(self).__name__} status={self.status!r} "
+            f"content_type={self.content_type!r} size={len(self._body)}>"
+        )
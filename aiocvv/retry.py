@@ -0,0 +1,89 @@
+"""
+This module contains what the client uses to deal with
+the outages of the Classeviva API: retries and circuit breakers.
+"""
+
+import random
+import time
+from typing import Optional
+
+from .errors import CircuitBreakerOpen
+
+IDEMPOTENT_METHODS = frozenset(("GET", "HEAD", "OPTIONS", "PUT", "DELETE"))
+
+
+def backoff_delay(attempt: int, base: float, cap: float = 30.0) -> float:
+    """
+    Get how long to wait before retrying a request, using exponential
+    backoff with full jitter so that many clients don't retry all at once.
+
+    :param attempt: How many retries have already been made.
+    :param base: The delay of the first retry, before the jitter is applied.
+    :param cap: Optional. The maximum delay.
+    :return: The delay in seconds.
+    """
+    return random.uniform(0, min(cap, base * 2**attempt))
+
+
+class CircuitBreaker:
+    """
+    A circuit breaker, which stops requests from being made
+    to a base URL while its server looks like it's down.
+
+    After ``threshold`` consecutive failures the circuit opens, and every request
+    fails immediately with :class:`~aiocvv.errors.CircuitBreakerOpen`. Once
+    ``reset_timeout`` seconds have passed, a single request is let through: if
+    it succeeds the circuit closes again, otherwise it stays open for another
+    ``reset_timeout`` seconds.
+
+    :param threshold: Optional. How many consecutive failures open the circuit.
+    :param reset_timeout: Optional. How many seconds the circuit stays open.
+    """
+
+    def __init__(self, threshold: int = 5, reset_timeout: float = 30.0):
+        if threshold < 1:
+            raise ValueError("threshold must be at least 1")
+
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.__failures = 0
+        self.__opened_at: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        """The state of the circuit: ``closed``, ``open`` or ``half-open``."""
+        if self.__opened_at is None:
+            return "closed"
+
+        if time.monotonic() - self.__opened_at < self.reset_timeout:
+            return "open"
+
+        return "half-open"
+
+    def before_request(self):
+        """
+        Check whether a request can be made.
+
+        :raises CircuitBreakerOpen: If the circuit is open.
+        """
+        state = self.state
+        if state == "open":
+            remaining = self.reset_timeout - (time.monotonic() - self.__opened_at)
+            raise CircuitBreakerOpen(
+                f"The server looks like it's down, not retrying for {remaining:.1f} seconds"
+            )
+
+        if state == "half-open":
+            # let this request through, but keep the others out until it's done
+            self.__opened_at = time.monotonic()
+
+    def record_success(self):
+        """Record a successful request, closing the circuit."""
+        self.__failures = 0
+        self.__opened_at = None
+
+    def record_failure(self):
+        """Record a failed request, opening the circuit if too many failed in a row."""
+        self.__failures += 1
+        if self.__failures >= self.threshold:
+            self.__opened_at = time.monotonic()
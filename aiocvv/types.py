@@ -5,11 +5,12 @@ Type hints that are used across the whole project.
 from typing import TypedDict, Any, Dict, Union, TypeVar
 from datetime import date, datetime
 from .errors import ClassevivaError
+from .response import Response  # pylint: disable=unused-import
 
 
 class OKResponse(TypedDict):
     """
-    Type hint for a successful response.
+    Type hint for the keys of a successful :class:`~aiocvv.response.Response`.
     """
 
     created_at: int
@@ -30,14 +31,12 @@ class ErrorResponseContent(TypedDict):
 
 class ErrorResponse(OKResponse):
     """
-    Type hint for an error response.
+    Type hint for the keys of an error :class:`~aiocvv.response.Response`.
     """
 
     content: ErrorResponseContent
 
 
-Response = Union[OKResponse, ErrorResponse]
-
 Date = Union[date, datetime]
 
 CVVErrors = TypeVar("CVVErrors", bound=ClassevivaError)
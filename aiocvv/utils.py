@@ -2,11 +2,29 @@
 Useful functions used inside the library.
 """
 
+import os
+import json
+import asyncio
+from base64 import b64encode
 from datetime import datetime, date, timedelta
-from typing import Union, Type, Callable, Optional
+from typing import (
+    Union,
+    Type,
+    Callable,
+    Optional,
+    IO,
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Iterable,
+    List,
+    TypeVar,
+)
 from .errors import ClassevivaError
 from .types import AnyCVVError
 
+T = TypeVar("T")
+
 
 def create_repr(self, **kwargs):
     """
@@ -108,3 +126,104 @@ def group_by_date(
         ret[date_].append(parser(dt, *args, **kwargs) if parser else dt)
 
     return ret
+
+
+async def stream_json_with_file(
+    fields: dict,
+    file_field: str,
+    file: Union[IO[Any], str, "os.PathLike[str]"],
+    *,
+    loop: Optional[asyncio.AbstractEventLoop] = None,
+    chunk_size: int = 192 * 1024,
+) -> AsyncIterator[bytes]:
+    """
+    Generate a JSON object in chunks, where one of the fields is the content of a file encoded in base64.
+
+    The file is read and encoded a chunk at a time in an executor, so the
+    memory used doesn't depend on the size of the file.
+
+    :param fields: The other fields of the JSON object.
+    :param file_field: The name of the field containing the file.
+    :param file: The file object or the path of the file to read.
+    :param loop: Optional. The event loop to run the reads from.
+    :param chunk_size: Optional. How many bytes of the file are read at once.
+    """
+    loop = loop or asyncio.get_event_loop()
+    opened = not hasattr(file, "read")
+    if opened:
+        file = await loop.run_in_executor(None, open, os.fspath(file), "rb")
+
+    try:
+        head = json.dumps(fields)[:-1] + (", " if fields else "")
+        yield (head + json.dumps(file_field) + ': "').encode()
+
+        rest = b""
+        while True:
+            chunk = await loop.run_in_executor(None, file.read, chunk_size)
+            if not chunk:
+                break
+
+            if isinstance(chunk, str):
+                chunk = chunk.encode()
+
+            # only encode multiples of 3 bytes, so that no padding ends up in the middle
+            chunk = rest + chunk
+            cut = len(chunk) - len(chunk) % 3
+            rest = chunk[cut:]
+            if cut:
+                yield b64encode(chunk[:cut])
+
+        yield b64encode(rest) + b'"}'
+    finally:
+        if opened:
+            await loop.run_in_executor(None, file.close)
+
+
+async def gather_bounded(
+    fn: Callable[[T], Awaitable[Any]],
+    items: Iterable[T],
+    concurrency: int,
+    return_exceptions: bool = False,
+) -> List[Any]:
+    """
+    Call a coroutine function with every item, running at most
+    ``concurrency`` calls at once, and return the results in order.
+
+    Only ``concurrency`` tasks are created, each taking the next
+    item as soon as it's done with one.
+
+    :param fn: The coroutine function to call with each item.
+    :param items: The items.
+    :param concurrency: How many calls can run at once.
+    :param return_exceptions: Optional. Whether to return the exceptions raised
+                              for an item in its place instead of raising
+                              the first one and cancelling the others.
+    :return: What the function returned for each item.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+
+    items = list(items)
+    results: List[Any] = [None] * len(items)
+    pending = iter(enumerate(items))
+
+    async def worker():
+        for i, item in pending:
+            try:
+                results[i] = await fn(item)
+            except Exception as e:  # pylint: disable=broad-except
+                if not return_exceptions:
+                    raise
+
+                results[i] = e
+
+    workers = [
+        asyncio.ensure_future(worker()) for _ in range(min(concurrency, len(items)))
+    ]
+    try:
+        await asyncio.gather(*workers)
+    finally:
+        for task in workers:
+            task.cancel()
+
+    return results
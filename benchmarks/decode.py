@@ -0,0 +1,153 @@
+"""
+Benchmark of the decoding of the responses from the Classeviva API.
+
+It compares the JSON libraries supported by :mod:`aiocvv.codec` on
+year-sized ``grades2``, ``calendar/all`` and ``agenda`` payloads, and the
+time saved on binary downloads by not trying to parse them as JSON.
+
+Run it from the root of the repository::
+
+    python -m benchmarks.decode
+"""
+
+import os
+import json
+import random
+import timeit
+from datetime import date, timedelta
+
+from aiocvv.codec import LOADERS, decode_body
+
+START = date(2024, 9, 10)
+DAYS = 270
+
+
+def _days():
+    for i in range(DAYS):
+        yield START + timedelta(days=i)
+
+
+def grades2(per_day: int = 3) -> bytes:
+    """A grades2 response with a few grades for every school day."""
+    grades = []
+    for i, day in enumerate(_days()):
+        for j in range(per_day):
+            value = random.randint(3, 10)
+            grades.append(
+                {
+                    "subjectId": 200000 + j,
+                    "subjectCode": "",
+                    "subjectDesc": f"SUBJECT {j}",
+                    "evtId": i * per_day + j,
+                    "evtCode": "GRV0",
+                    "evtDate": day.isoformat(),
+                    "decimalValue": float(value),
+                    "displayValue": str(value),
+                    "displaPos": j,
+                    "notesForFamily": "Lorem ipsum dolor sit amet " * 3,
+                    "color": "green" if value >= 6 else "red",
+                    "canceled": False,
+                    "underlined": False,
+                    "periodPos": 1 if i < DAYS // 2 else 2,
+                    "periodDesc": "Trimestre" if i < DAYS // 2 else "Pentamestre",
+                    "componentPos": 1,
+                    "componentDesc": "Scritto",
+                    "weightFactor": 1,
+                    "skillId": 0,
+                    "gradeMasterId": 0,
+                    "skillDesc": None,
+                    "skillCode": None,
+                    "skillMasterId": 0,
+                    "skillValueDesc": " ",
+                    "skillValueShort": " ",
+                    "skillValueNote": "",
+                    "oldskillId": 0,
+                    "oldskillDesc": "",
+                }
+            )
+
+    return json.dumps({"grades": grades}).encode()
+
+
+def calendar() -> bytes:
+    """A calendar/all response with every day of the school year."""
+    return json.dumps(
+        {
+            "calendar": [
+                {
+                    "dayDate": day.isoformat(),
+                    "dayOfWeek": day.isoweekday(),
+                    "dayStatus": "SD" if day.isoweekday() < 7 else "HD",
+                }
+                for day in _days()
+            ]
+        }
+    ).encode()
+
+
+def agenda(per_day: int = 4) -> bytes:
+    """An agenda response with a few events for every school day."""
+    return json.dumps(
+        {
+            "agenda": [
+                {
+                    "evtId": i,
+                    "evtCode": "AGNT",
+                    "evtDatetimeBegin": f"{day.isoformat()}T08:00:00+02:00",
+                    "evtDatetimeEnd": f"{day.isoformat()}T09:00:00+02:00",
+                    "isFullDay": False,
+                    "notes": "Verifica di fine unità didattica " * 4,
+                    "authorName": "JOHN DOE",
+                    "classDesc": "5A INFORMATICA",
+                    "subjectId": 200000 + j,
+                    "subjectDesc": f"SUBJECT {j}",
+                    "homeworkId": None,
+                }
+                for i, day in enumerate(_days())
+                for j in range(per_day)
+            ]
+        }
+    ).encode()
+
+
+def old_decode(data: bytes):
+    """How the bodies were decoded before the codec was added."""
+    try:
+        return json.loads(data)
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        if not isinstance(e, UnicodeDecodeError):
+            return data.decode()
+
+    return data
+
+
+def bench(func, number: int) -> float:
+    """The best time of a few runs, in milliseconds per call."""
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1000
+
+
+def main():
+    random.seed(0)
+    payloads = {
+        "grades2": grades2(),
+        "calendar/all": calendar(),
+        "agenda": agenda(),
+    }
+
+    print(f"{'payload':<14}{'size':>10}" + "".join(f"{n:>10}" for n in LOADERS))
+    for name, data in payloads.items():
+        times = [bench(lambda: loads(data), 20) for loads in LOADERS.values()]
+        print(
+            f"{name:<14}{len(data) // 1024:>8}KB"
+            + "".join(f"{t:>8.2f}ms" for t in times)
+        )
+
+    # a JPEG-like body, which used to be parsed as JSON before being given up on
+    binary = b"\xff\xd8\xff\xe0" + os.urandom(1024 * 1024)
+    old = bench(lambda: old_decode(binary), 50)
+    new = bench(lambda: decode_body(binary, "image/jpeg"), 50)
+    print(f"\n1MB image: {old:.3f}ms before, {new:.4f}ms now")
+
+
+if __name__ == "__main__":
+    main()
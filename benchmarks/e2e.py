@@ -0,0 +1,261 @@
+"""
+End-to-end benchmark of the high-level helpers, against the mock server
+in :mod:`benchmarks.server`.
+
+For ``me.get_grades()``, ``me.get_subjects(include_grades=True)``, a week of
+``me.calendar(...)``, the grades, notes and absences of every period and the
+iteration of ``me.noticeboard``, it measures how many calls per second are made, their
+p50 and p99 latency and how many HTTP requests each of them sends:
+
+* with the cold cache, where every call is made by a new client;
+* with the warm cache, where the same client makes every call;
+
+and both with ``strict_caching`` on and off. The clients keep their cache
+in memory, so that the disk doesn't affect the results.
+
+When no errors are injected, the HTTP requests of each call are also
+checked against the most each helper should send, even with nothing
+fresh in the cache, and the benchmark exits with an error if a helper
+sends more. Run it with ``--max-age 0`` to check the worst case.
+
+Run it from the root of the repository::
+
+    python -m benchmarks.e2e
+    python -m benchmarks.e2e --max-age 0
+    python -m benchmarks.e2e --latency 30 --max-age 1 --error-rate 0.02
+"""
+
+import sys
+import time
+import asyncio
+import argparse
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from aiocvv import ClassevivaClient
+from aiocvv.backends import MemoryBackend
+
+from .server import MockServer, Dataset, USERNAME, PASSWORD
+
+Helper = Callable[[ClassevivaClient], Awaitable[object]]
+# the most HTTP requests a call should send with the cold and the warm cache
+Budget = Tuple[int, int]
+
+
+async def get_grades(client: ClassevivaClient):
+    return await client.me.get_grades()
+
+
+async def get_subjects_with_grades(client: ClassevivaClient):
+    return await client.me.get_subjects(include_grades=True)
+
+
+def calendar(days: int) -> Helper:
+    begin = datetime.combine(Dataset().start, datetime.min.time())
+    end = begin + timedelta(days=days - 1)
+
+    async def iterate(client: ClassevivaClient):
+        return [day async for day in client.me.calendar(begin, end)]
+
+    return iterate
+
+
+async def period_summary(client: ClassevivaClient):
+    # like the year summary in example.py
+    return [
+        (
+            await period.get_grades(),
+            await period.get_notes(),
+            await period.get_absences(),
+        )
+        for period in await client.me.calendar.get_periods()
+    ]
+
+
+async def noticeboard(client: ClassevivaClient):
+    return [item async for item in client.me.noticeboard]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """The nearest-rank percentile of a list of values."""
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))]
+
+
+class Runner:
+    """
+    Runs the helpers against a mock server.
+
+    :param server: The mock server, which must be started.
+    :param base_url: The base URL of the server.
+    :param iterations: How many times each helper is called.
+    """
+
+    def __init__(self, server: MockServer, base_url: str, iterations: int):
+        self.server = server
+        self.base_url = base_url
+        self.iterations = iterations
+
+    async def client(self, strict_caching: bool) -> ClassevivaClient:
+        """A logged in client with an empty cache."""
+        client = ClassevivaClient(
+            USERNAME,
+            PASSWORD,
+            base_url=self.base_url,
+            strict_caching=strict_caching,
+            cache_backend=MemoryBackend(),
+            persist_tokens=False,
+        )
+        try:
+            await client.login()
+        except BaseException:
+            await client.close()
+            raise
+
+        return client
+
+    async def run(self, helper: Helper, strict_caching: bool, warm: bool) -> Dict:
+        """
+        Call a helper :attr:`iterations` times.
+
+        A call fails if its client can't log in, if the warm-up call
+        fails or if the helper raises; failures are counted rather
+        than stopping the benchmark.
+
+        :return: The times of the calls which succeeded, the HTTP requests
+                 they sent and how many calls failed.
+        """
+        times = []
+        requests = failed = 0
+        client = None
+        try:
+            for _ in range(self.iterations):
+                if client is None:
+                    # neither the login nor the warm-up are part of what's measured
+                    try:
+                        client = await self.client(strict_caching)
+                        if warm:
+                            await helper(client)
+                    except Exception:  # pylint: disable=broad-except
+                        failed += 1
+                        continue
+
+                sent = self.server.requests
+                start = time.perf_counter()
+                try:
+                    await helper(client)
+                except Exception:  # pylint: disable=broad-except
+                    failed += 1
+                else:
+                    times.append(time.perf_counter() - start)
+
+                requests += self.server.requests - sent
+                if not warm:
+                    await client.close()
+                    client = None
+        finally:
+            if client is not None:
+                await client.close()
+
+        return {"times": times, "requests": requests, "failed": failed}
+
+
+def report(name: str, result: Dict, iterations: int, budget: Optional[int] = None):
+    times = result["times"]
+    if not times:
+        print(f"{name:<48}{'every call failed':>40}")
+        return
+
+    requests = result["requests"] / iterations
+    print(
+        f"{name:<48}"
+        f"{len(times) / sum(times):>9.1f}/s"
+        f"{percentile(times, 50) * 1000:>9.1f}ms"
+        f"{percentile(times, 99) * 1000:>9.1f}ms"
+        f"{requests:>10.1f}"
+        f"{result['failed']:>8}"
+        + (
+            f"  over budget of {budget}"
+            if budget is not None and requests > budget
+            else ""
+        )
+    )
+
+
+async def bench(args: argparse.Namespace) -> bool:
+    """
+    Run every helper and report how it went.
+
+    :return: Whether every helper kept within its budget of requests.
+    """
+    server = MockServer(
+        latency=args.latency / 1000,
+        jitter=args.jitter / 1000,
+        max_age=args.max_age,
+        rate_limit_rate=args.rate_limit_rate,
+        error_rate=args.error_rate,
+    )
+    base_url = await server.start()
+    runner = Runner(server, base_url, args.iterations)
+    windows = -(-args.days // 31)
+    helpers: Dict[str, Tuple[Helper, Optional[Budget]]] = {
+        # grades2, subjects and periods
+        "get_grades": (get_grades, (3, 3)),
+        "get_subjects(include_grades)": (get_subjects_with_grades, (3, 3)),
+        # subjects, periods and a calendar and an overview for each window
+        f"calendar ({args.days} days)": (
+            calendar(args.days),
+            (2 + 2 * windows, 2 + 2 * windows),
+        ),
+        # periods, then grades2, notes, absences and subjects once per client
+        "period summary": (period_summary, (6, 1)),
+        # one request for each item that's read
+        "noticeboard": (noticeboard, None),
+    }
+    # retried requests would count against the budgets
+    check = not args.rate_limit_rate and not args.error_rate
+
+    print(
+        f"{'helper':<48}{'calls':>11}{'p50':>11}{'p99':>11}{'reqs/call':>10}{'failed':>8}"
+    )
+    over = []
+    try:
+        for name, (helper, budget) in helpers.items():
+            for strict in (True, False):
+                for warm in (False, True):
+                    result = await runner.run(helper, strict, warm)
+                    label = (
+                        f"{name}, {'warm' if warm else 'cold'}, "
+                        f"strict={'on' if strict else 'off'}"
+                    )
+                    limit = budget[warm] if check and budget is not None else None
+                    report(label, result, args.iterations, limit)
+                    if (
+                        limit is not None
+                        and result["requests"] > limit * args.iterations
+                    ):
+                        over.append(label)
+    finally:
+        await server.stop()
+
+    if over:
+        print(f"\n{len(over)} over their budget of requests: {'; '.join(over)}")
+
+    return not over
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--days", type=int, default=7, help="of the calendar")
+    parser.add_argument("--latency", type=float, default=5, help="in milliseconds")
+    parser.add_argument("--jitter", type=float, default=0, help="in milliseconds")
+    parser.add_argument("--max-age", type=int, default=60, help="in seconds")
+    parser.add_argument("--rate-limit-rate", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0)
+    if not asyncio.run(bench(parser.parse_args())):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,707 @@
+"""
+A local stand-in for the Classeviva REST API, for the end-to-end benchmarks.
+
+It serves a single student with a whole school year of made-up data on the
+endpoints the high-level helpers use: ``auth/login``, ``auth/status``,
+``card``, ``subjects``, ``periods``, ``grades2``, ``notes``, ``absences``,
+``overview``, ``calendar``, ``agenda``, ``lessons`` and ``noticeboard``.
+
+Every response can be delayed, is sent with an ``ETag`` (and answered with
+``304 Not Modified`` when it matches) and with a ``Z-Cache-Control`` header,
+and a share of the requests can be failed with ``429 Too Many Requests``
+or ``503 Service Unavailable``. The logins are never failed, since they
+aren't part of what's measured.
+
+It can also be run on its own, to point a client at it by hand::
+
+    python -m benchmarks.server --port 8080 --latency 20
+"""
+
+import json
+import random
+import asyncio
+import hashlib
+import argparse
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional, Any, Dict, List, Set
+
+from aiohttp import web
+
+START = date(2024, 9, 10)
+DAYS = 270
+
+STUDENT_ID = 1234567
+IDENTITY = f"S{STUDENT_ID}X"
+USERNAME = IDENTITY
+PASSWORD = "password"
+
+SUBJECTS = 8
+NOTE_TYPES = ("NTTE", "NTCL", "NTWN", "NTST")
+
+
+def _parse_date(value: str) -> date:
+    if value in ("today", "yesterday"):
+        return date.today() - timedelta(days=value == "yesterday")
+
+    return datetime.strptime(value, "%Y%m%d").date()
+
+
+class Dataset:
+    """
+    A school year of data for the student, with the same fields as the real API.
+
+    :param seed: Optional. The seed of the random values.
+    :param start: Optional. The first day of the school year.
+    :param days: Optional. How many days the school year lasts.
+    :param noticeboard_items: Optional. How many items are in the noticeboard.
+    """
+
+    def __init__(
+        self,
+        seed: int = 0,
+        start: date = START,
+        days: int = DAYS,
+        noticeboard_items: int = 40,
+    ):
+        rnd = random.Random(seed)
+        self.start = start
+        self.end = start + timedelta(days=days - 1)
+        self.days = [start + timedelta(days=i) for i in range(days)]
+        middle = start + timedelta(days=days // 2)
+
+        self.subjects = [
+            {
+                "id": 200000 + i,
+                "description": f"SUBJECT {i}",
+                "order": i,
+                "teachers": [{"teacherId": f"T{i}", "teacherName": "JOHN DOE"}],
+            }
+            for i in range(SUBJECTS)
+        ]
+        self.periods = [
+            {
+                "periodCode": "Q1",
+                "periodPos": 1,
+                "periodDesc": "Trimestre",
+                "isFinal": False,
+                "dateStart": start.isoformat(),
+                "dateEnd": (middle - timedelta(days=1)).isoformat(),
+                "miurDivisionCode": None,
+            },
+            {
+                "periodCode": "Q3",
+                "periodPos": 2,
+                "periodDesc": "Pentamestre",
+                "isFinal": True,
+                "dateStart": middle.isoformat(),
+                "dateEnd": self.end.isoformat(),
+                "miurDivisionCode": None,
+            },
+        ]
+
+        self.calendar = [
+            {
+                "dayDate": day.isoformat(),
+                # the API counts the days of the week from sunday
+                "dayOfWeek": day.isoweekday() % 7 + 1,
+                "dayStatus": "SD" if day.isoweekday() < 7 else "HD",
+            }
+            for day in self.days
+        ]
+        school_days = [d for d in self.days if d.isoweekday() < 7]
+
+        self.grades = []
+        self.lessons = []
+        self.agenda = []
+        self.events = []
+        self.notes: Dict[str, List[dict]] = {tp: [] for tp in NOTE_TYPES}
+        for i, day in enumerate(school_days):
+            period = 1 if day < middle else 2
+            for hour in range(5):
+                subject = self.subjects[(i + hour) % SUBJECTS]
+                self.lessons.append(
+                    {
+                        "evtId": len(self.lessons),
+                        "evtDate": day.isoformat(),
+                        "evtCode": "LSF0",
+                        "evtHPos": hour + 1,
+                        "evtDuration": 1,
+                        "classDesc": "5A INFORMATICA",
+                        "authorName": "JOHN DOE",
+                        "subjectId": subject["id"],
+                        "subjectCode": "",
+                        "subjectDesc": subject["description"],
+                        "lessonType": "Lezione",
+                        "lessonArg": "Lorem ipsum dolor sit amet " * 2,
+                        "status": "HAT0",
+                    }
+                )
+
+            if rnd.random() < 0.6:
+                subject = rnd.choice(self.subjects)
+                value = rnd.randint(3, 10)
+                self.grades.append(
+                    {
+                        "subjectId": subject["id"],
+                        "subjectCode": "",
+                        "subjectDesc": subject["description"],
+                        "evtId": len(self.grades),
+                        "evtCode": "GRV0",
+                        "evtDate": day.isoformat(),
+                        "decimalValue": float(value),
+                        "displayValue": str(value),
+                        "displaPos": 1,
+                        "notesForFamily": "Lorem ipsum dolor sit amet " * 3,
+                        "color": "green" if value >= 6 else "red",
+                        "canceled": False,
+                        "underlined": False,
+                        "periodPos": period,
+                        "periodDesc": self.periods[period - 1]["periodDesc"],
+                        "componentPos": 1,
+                        "componentDesc": "Scritto",
+                        "weightFactor": 1,
+                        "skillId": 0,
+                        "gradeMasterId": 0,
+                        "skillDesc": None,
+                        "skillCode": None,
+                        "skillMasterId": 0,
+                        "skillValueDesc": " ",
+                        "skillValueShort": " ",
+                        "skillValueNote": "",
+                        "oldskillId": 0,
+                        "oldskillDesc": "",
+                    }
+                )
+
+            if rnd.random() < 0.4:
+                subject = rnd.choice(self.subjects)
+                self.agenda.append(
+                    {
+                        "evtId": len(self.agenda),
+                        "evtCode": rnd.choice(("AGNT", "AGHW")),
+                        "evtDatetimeBegin": f"{day.isoformat()}T08:00:00+02:00",
+                        "evtDatetimeEnd": f"{day.isoformat()}T09:00:00+02:00",
+                        "isFullDay": False,
+                        "notes": "Verifica di fine unità didattica " * 4,
+                        "authorName": "JOHN DOE",
+                        "classDesc": "5A INFORMATICA",
+                        "subjectId": subject["id"],
+                        "subjectDesc": subject["description"],
+                        "homeworkId": None,
+                    }
+                )
+
+            if rnd.random() < 0.05:
+                self.events.append(
+                    {
+                        "evtId": len(self.events),
+                        "evtCode": rnd.choice(("ABA0", "ABR0", "ABU0")),
+                        "evtDate": day.isoformat(),
+                        "evtHPos": 1,
+                        "evtValue": None,
+                        "isJustified": rnd.random() < 0.5,
+                        "justifReasonCode": None,
+                        "justifReasonDesc": None,
+                        "hoursAbsence": [],
+                    }
+                )
+
+            if rnd.random() < 0.05:
+                tp = rnd.choice(NOTE_TYPES)
+                self.notes[tp].append(
+                    {
+                        "evtId": sum(len(n) for n in self.notes.values()),
+                        "evtText": "Lorem ipsum dolor sit amet",
+                        "evtDate": day.isoformat(),
+                        "authorName": "JOHN DOE",
+                        "readStatus": True,
+                    }
+                )
+
+        self.noticeboard = [
+            {
+                "pubId": 1000 + i,
+                "pubDT": f"{school_days[i % len(school_days)].isoformat()}T08:00:00+02:00",
+                "readStatus": i % 2 == 0,
+                "evtCode": "CF",
+                "cntId": 5000 + i,
+                "cntValidFrom": self.start.isoformat(),
+                "cntValidTo": self.end.isoformat(),
+                "cntValidInRange": True,
+                "cntStatus": "active",
+                "cntTitle": f"Circolare n. {i}",
+                "cntCategory": "Circolari",
+                "cntHasChanged": False,
+                "cntHasAttach": True,
+                "needJoin": False,
+                "needReply": False,
+                "needFile": False,
+                "evento_id": str(5000 + i),
+                "attachments": [{"fileName": f"circolare_{i}.pdf", "attachNum": 1}],
+            }
+            for i in range(noticeboard_items)
+        ]
+
+    @staticmethod
+    def __between(items: List[dict], start: date, end: date) -> List[dict]:
+        first, last = start.isoformat(), end.isoformat()
+        return [
+            item
+            for item in items
+            if first
+            <= item.get("evtDate", item.get("evtDatetimeBegin", ""))[:10]
+            <= last
+        ]
+
+    def card(self) -> dict:
+        """The student's card."""
+        return {
+            "ident": IDENTITY,
+            "usrType": "S",
+            "usrId": STUDENT_ID,
+            "miurSchoolCode": "XXXX00000X",
+            "miurDivisionCode": "XXXX00000X",
+            "firstName": "MARIO",
+            "lastName": "ROSSI",
+            "birthDate": "2006-01-01",
+            "fiscalCode": "RSSMRA06A01H501X",
+            "schCode": "XXXX0000",
+            "schName": "ISTITUTO DI ISTRUZIONE SUPERIORE",
+            "schDedication": "GALILEO GALILEI",
+            "schCity": "ROMA",
+            "schProv": "RM",
+        }
+
+    def overview(self, start: date, end: date) -> dict:
+        """Everything that happened in a range of dates."""
+        return {
+            "virtualClassesAgenda": [],
+            "lessons": self.__between(self.lessons, start, end),
+            "agenda": self.__between(self.agenda, start, end),
+            "events": self.__between(self.events, start, end),
+            "grades": self.__between(self.grades, start, end),
+            "note": None,
+            "notes": {
+                tp: self.__between(notes, start, end)
+                for tp, notes in self.notes.items()
+            },
+        }
+
+    def absences_between(self, start: date, end: date) -> List[dict]:
+        """The absences in a range of dates."""
+        return self.__between(self.events, start, end)
+
+    def calendar_between(self, start: date, end: date) -> List[dict]:
+        """The school days in a range of dates."""
+        return [
+            day
+            for day in self.calendar
+            if start.isoformat() <= day["dayDate"] <= end.isoformat()
+        ]
+
+    def agenda_between(
+        self, start: date, end: date, code: Optional[str] = None
+    ) -> List[dict]:
+        """The agenda in a range of dates, optionally of a single kind of event."""
+        return [
+            event
+            for event in self.__between(self.agenda, start, end)
+            if code is None or event["evtCode"] == code
+        ]
+
+    def lessons_between(
+        self, start: date, end: date, subject: Optional[int] = None
+    ) -> List[dict]:
+        """The lessons in a range of dates, optionally of a single subject."""
+        return [
+            lesson
+            for lesson in self.__between(self.lessons, start, end)
+            if subject is None or lesson["subjectId"] == subject
+        ]
+
+
+class MockServer:
+    """
+    The mock server, which can be started in the running event loop.
+
+    .. code-block:: python
+
+        server = MockServer(latency=0.02, max_age=5)
+        base_url = await server.start()
+        async with ClassevivaClient(USERNAME, PASSWORD, base_url=base_url) as client:
+            ...
+        await server.stop()
+
+    :param latency: Optional. How many seconds every response is delayed by.
+    :param jitter: Optional. How many seconds, at most, are randomly added to the latency.
+    :param max_age: Optional. The ``max-age`` sent in the ``Z-Cache-Control``
+                    header, in seconds. None to leave the header out.
+    :param etags: Optional. Whether to send ``ETag`` headers and honor ``If-None-Match``.
+    :param rate_limit_rate: Optional. The share of requests answered with
+                            ``429 Too Many Requests``.
+    :param error_rate: Optional. The share of requests answered with
+                       ``503 Service Unavailable``.
+    :param retry_after: Optional. The ``Retry-After`` sent with the 429 responses,
+                        in seconds.
+    :param token_ttl: Optional. How many seconds the tokens last.
+    :param seed: Optional. The seed of the data and of the injected faults.
+    """
+
+    def __init__(
+        self,
+        *,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        max_age: Optional[int] = 60,
+        etags: bool = True,
+        rate_limit_rate: float = 0.0,
+        error_rate: float = 0.0,
+        retry_after: float = 0.1,
+        token_ttl: int = 5400,
+        seed: int = 0,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.max_age = max_age
+        self.etags = etags
+        self.rate_limit_rate = rate_limit_rate
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.token_ttl = token_ttl
+        self.data = Dataset(seed)
+        self.hits: Counter = Counter()
+        self.statuses: Counter = Counter()
+        self.__random = random.Random(seed)
+        self.__bodies: Dict[Any, bytes] = {}
+        self.__issued: Set[str] = set()
+        self.__revoked: Set[str] = set()
+        self.__runner: Optional[web.AppRunner] = None
+
+    @property
+    def requests(self) -> int:
+        """How many requests have been received."""
+        return sum(self.hits.values())
+
+    def revoke_tokens(self):
+        """Revoke every token issued so far, before they expire."""
+        self.__revoked |= self.__issued
+
+    def reset_stats(self):
+        """Forget the requests received so far."""
+        self.hits.clear()
+        self.statuses.clear()
+
+    def __json(self, request: web.Request, key: Any, build) -> web.Response:
+        # the bodies are serialized once, like a real server would cache them
+        body = self.__bodies.get(key)
+        if body is None:
+            body = self.__bodies[key] = json.dumps(build()).encode()
+
+        headers = {"Content-Type": "application/json"}
+        if self.max_age is not None:
+            headers["Z-Cache-Control"] = f"max-age={self.max_age}"
+
+        if self.etags:
+            headers["ETag"] = f'"{hashlib.md5(body).hexdigest()}"'
+            if request.headers.get("If-None-Match") == headers["ETag"]:
+                return web.Response(status=304, headers=headers)
+
+        return web.Response(body=body, headers=headers)
+
+    @staticmethod
+    def __error(status: int, error: str, message: str, **headers) -> web.Response:
+        return web.json_response(
+            {
+                "statusCode": status,
+                "error": f"{status}/{error}",
+                "info": error,
+                "message": message,
+            },
+            status=status,
+            headers=headers,
+        )
+
+    @web.middleware
+    async def __middleware(self, request: web.Request, handler) -> web.StreamResponse:
+        route = request.match_info.route.resource
+        self.hits[route.canonical if route is not None else request.path] += 1
+        delay = self.latency + self.__random.random() * self.jitter
+        if delay:
+            await asyncio.sleep(delay)
+
+        # the logins are never failed, they aren't what's being measured
+        roll = (
+            1.0 if request.path.startswith("/rest/v1/auth/") else self.__random.random()
+        )
+        if roll < self.rate_limit_rate:
+            resp = self.__error(
+                429,
+                "too many requests",
+                "Rate limit exceeded",
+                **{"Retry-After": str(self.retry_after)},
+            )
+        elif roll < self.rate_limit_rate + self.error_rate:
+            resp = self.__error(503, "service unavailable", "Try again later")
+        elif (
+            request.path.startswith("/rest/v1/students/")
+            and "Z-Auth-Token" not in request.headers
+        ):
+            resp = self.__error(401, "unauthorized", "Missing token")
+        elif request.headers.get("Z-Auth-Token") in self.__revoked:
+            resp = self.__error(401, "unauthorized", "Revoked token")
+        else:
+            resp = await handler(request)
+
+        self.statuses[resp.status] += 1
+        return resp
+
+    async def __login(self, request: web.Request) -> web.Response:
+        data = await request.json()
+        if data.get("uid") != USERNAME or data.get("pass") != PASSWORD:
+            return self.__error(422, "authentication failed", "WrongCredentials")
+
+        now = datetime.now(timezone.utc)
+        token = hashlib.sha1(f"{now.isoformat()}{len(self.__issued)}".encode())
+        self.__issued.add(token.hexdigest())
+        return web.json_response(
+            {
+                "ident": IDENTITY,
+                "firstName": "MARIO",
+                "lastName": "ROSSI",
+                "showPwdChangeReminder": False,
+                "token": token.hexdigest(),
+                "release": now.isoformat(),
+                "expire": (now + timedelta(seconds=self.token_ttl)).isoformat(),
+            }
+        )
+
+    async def __status(self, request: web.Request) -> web.Response:
+        now = datetime.now(timezone.utc)
+        return web.json_response(
+            {
+                "status": {
+                    "expire": (now + timedelta(seconds=self.token_ttl)).isoformat(),
+                    "release": now.isoformat(),
+                    "ident": IDENTITY,
+                    "remains": self.token_ttl,
+                }
+            }
+        )
+
+    async def __card(self, request: web.Request) -> web.Response:
+        return self.__json(request, "card", lambda: {"card": self.data.card()})
+
+    async def __subjects(self, request: web.Request) -> web.Response:
+        return self.__json(
+            request, "subjects", lambda: {"subjects": self.data.subjects}
+        )
+
+    async def __periods(self, request: web.Request) -> web.Response:
+        return self.__json(request, "periods", lambda: {"periods": self.data.periods})
+
+    async def __grades(self, request: web.Request) -> web.Response:
+        subject = request.match_info.get("subject")
+        grades = self.data.grades
+        if subject is not None:
+            grades = [g for g in grades if g["subjectId"] == int(subject)]
+
+        return self.__json(request, ("grades2", subject), lambda: {"grades": grades})
+
+    async def __notes(self, request: web.Request) -> web.Response:
+        return self.__json(request, "notes", lambda: dict(self.data.notes))
+
+    async def __absences(self, request: web.Request) -> web.Response:
+        if "start" not in request.match_info:
+            return self.__json(
+                request, "absences", lambda: {"events": self.data.events}
+            )
+
+        start = _parse_date(request.match_info["start"])
+        end = _parse_date(request.match_info["end"] or request.match_info["start"])
+        return self.__json(
+            request,
+            ("absences", start, end),
+            lambda: {"events": self.data.absences_between(start, end)},
+        )
+
+    async def __overview(self, request: web.Request) -> web.Response:
+        start = _parse_date(request.match_info["start"])
+        end = _parse_date(request.match_info["end"] or request.match_info["start"])
+        return self.__json(
+            request, ("overview", start, end), lambda: self.data.overview(start, end)
+        )
+
+    async def __calendar(self, request: web.Request) -> web.Response:
+        if "start" not in request.match_info:
+            return self.__json(
+                request, "calendar", lambda: {"calendar": self.data.calendar}
+            )
+
+        start = _parse_date(request.match_info["start"])
+        end = _parse_date(request.match_info["end"])
+        return self.__json(
+            request,
+            ("calendar", start, end),
+            lambda: {"calendar": self.data.calendar_between(start, end)},
+        )
+
+    async def __agenda(self, request: web.Request) -> web.Response:
+        code = request.match_info["code"]
+        start = _parse_date(request.match_info["start"])
+        end = _parse_date(request.match_info["end"])
+        return self.__json(
+            request,
+            ("agenda", code, start, end),
+            lambda: {
+                "agenda": self.data.agenda_between(
+                    start, end, None if code == "all" else code
+                )
+            },
+        )
+
+    async def __lessons(self, request: web.Request) -> web.Response:
+        # start[/end][/subject], where the end is left out for a single day
+        parts = [p for p in request.match_info["tail"].split("/") if p]
+        if not parts:
+            return self.__error(404, "not found", "Not found")
+
+        start = _parse_date(parts[0])
+        end = start
+        subject = None
+        if len(parts) > 1 and len(parts[1]) == 8:
+            end = _parse_date(parts[1])
+            parts = parts[2:]
+        else:
+            parts = parts[1:]
+
+        if parts:
+            subject = int(parts[-1])
+
+        return self.__json(
+            request,
+            ("lessons", start, end, subject),
+            lambda: {"lessons": self.data.lessons_between(start, end, subject)},
+        )
+
+    async def __noticeboard(self, request: web.Request) -> web.Response:
+        return self.__json(
+            request, "noticeboard", lambda: {"items": self.data.noticeboard}
+        )
+
+    async def __noticeboard_read(self, request: web.Request) -> web.Response:
+        pub_id = int(request.match_info["pub_id"])
+        for item in self.data.noticeboard:
+            if item["pubId"] == pub_id:
+                return web.json_response(
+                    {
+                        "event": {"evtCode": item["evtCode"], "pubId": pub_id},
+                        "item": {
+                            "title": item["cntTitle"],
+                            "text": "Lorem ipsum dolor sit amet " * 20,
+                        },
+                        "reply": {},
+                    }
+                )
+
+        return self.__error(404, "not found", "No such item")
+
+    def build_app(self) -> web.Application:
+        """Build the aiohttp application serving the API."""
+        app = web.Application(middlewares=[self.__middleware])
+        students = "/rest/v1/students/{id}"
+        app.add_routes(
+            [
+                web.post("/rest/v1/auth/login", self.__login),
+                web.get("/rest/v1/auth/status", self.__status),
+                web.get(f"{students}/card", self.__card),
+                web.get(f"{students}/subjects", self.__subjects),
+                web.get(f"{students}/periods", self.__periods),
+                web.get(f"{students}/grades2", self.__grades),
+                web.get(f"{students}/grades2/subjects/{{subject}}", self.__grades),
+                web.get(f"{students}/notes/all", self.__notes),
+                web.get(f"{students}/absences/details", self.__absences),
+                web.get(
+                    f"{students}/absences/details/{{start}}/{{end:\\d*}}",
+                    self.__absences,
+                ),
+                web.get(
+                    f"{students}/overview/all/{{start}}/{{end:\\d*}}", self.__overview
+                ),
+                web.get(f"{students}/calendar/all", self.__calendar),
+                web.get(f"{students}/calendar/{{start}}/{{end}}", self.__calendar),
+                web.get(f"{students}/agenda/{{code}}/{{start}}/{{end}}", self.__agenda),
+                web.get(f"{students}/lessons/{{tail:.*}}", self.__lessons),
+                web.get(f"{students}/lessons-status/{{tail:.*}}", self.__lessons),
+                web.get(f"{students}/noticeboard", self.__noticeboard),
+                web.post(
+                    f"{students}/noticeboard/read/{{code}}/{{pub_id}}/{{flags}}",
+                    self.__noticeboard_read,
+                ),
+            ]
+        )
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """
+        Start serving in the running event loop.
+
+        :param host: Optional. The address to listen on.
+        :param port: Optional. The port to listen on. By default, a free one is picked.
+        :return: The base URL to give to the client.
+        """
+        self.__runner = web.AppRunner(self.build_app(), access_log=None)
+        await self.__runner.setup()
+        site = web.TCPSite(self.__runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[
+            1
+        ]  # pylint: disable=protected-access
+        return f"http://{host}:{port}/rest/v1/"
+
+    async def stop(self):
+        """Stop serving."""
+        if self.__runner is not None:
+            await self.__runner.cleanup()
+            self.__runner = None
+
+
+async def serve(host: str, port: int, **options):
+    """Run the mock server until it's interrupted."""
+    server = MockServer(**options)
+    base_url = await server.start(host, port)
+    print(f"Serving on {base_url} (username {USERNAME!r}, password {PASSWORD!r})")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0, help="in milliseconds")
+    parser.add_argument("--max-age", type=int, default=60)
+    parser.add_argument("--no-etags", dest="etags", action="store_false")
+    parser.add_argument("--rate-limit-rate", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0)
+    args = parser.parse_args()
+    try:
+        asyncio.run(
+            serve(
+                args.host,
+                args.port,
+                latency=args.latency / 1000,
+                max_age=args.max_age,
+                etags=args.etags,
+                rate_limit_rate=args.rate_limit_rate,
+                error_rate=args.error_rate,
+            )
+        )
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -32,10 +32,12 @@ async def main():
         total_absences = 0
         total_notes = 0
         grades_sum = 0
-        for period in await client.me.calendar.get_periods():
-            grades = [g for g in await period.get_grades() if g.value is not None]
-            notes = await period.get_notes()
-            absences = await period.get_absences()
+        # everything is fetched once, and then split among the periods
+        partition = await client.me.calendar.partition_by_period()
+        for period, records in partition.items():
+            grades = [g for g in records.grades if g.value is not None]
+            notes = records.notes
+            absences = records.absences
 
             total_grades += len(grades)
             total_absences += len(absences)
@@ -155,6 +157,8 @@ async def main():
         print()
         print()
 
+    await client.close()
+
 
 def print_grade(grade: Grade):
     real_val = (
@@ -25,7 +25,14 @@ setup(
     long_description=long_desc,
     long_description_content_type="text/markdown",
     packages=packages,
-    install_requires=["aiohttp", "appdirs", "bcrypt", "typing-extensions", "diskcache"],
+    install_requires=[
+        "aiohttp",
+        "appdirs",
+        "bcrypt",
+        "typing-extensions",
+        "diskcache>=5,<6",
+    ],
+    extras_require={"speedups": ["orjson"]},
     python_requires=">=3.7",
     **kwargs
 )
@@ -0,0 +1,151 @@
+"""
+Tests for the authentication of the client, against the mock server
+in :mod:`benchmarks.server`.
+"""
+
+import asyncio
+
+import bcrypt
+
+from aiocvv import ClassevivaClient
+from aiocvv._auth import TokenStore
+from aiocvv.backends import MemoryBackend
+
+from benchmarks.server import MockServer, USERNAME, PASSWORD, STUDENT_ID
+
+LOGIN = "/rest/v1/auth/login"
+
+
+def client(base_url: str, backend: MemoryBackend) -> ClassevivaClient:
+    return ClassevivaClient(
+        USERNAME, PASSWORD, base_url=base_url, cache_backend=backend
+    )
+
+
+def test_concurrent_requests_log_in_once_after_expiry():
+    async def main():
+        server = MockServer(latency=0.01, token_ttl=1)
+        base_url = await server.start()
+        try:
+            async with ClassevivaClient(
+                USERNAME,
+                PASSWORD,
+                base_url=base_url,
+                cache_backend=MemoryBackend(),
+                persist_tokens=False,
+            ) as client:
+                await asyncio.sleep(1.5)
+                server.reset_stats()
+
+                # different endpoints, so that the requests aren't coalesced
+                responses = await asyncio.gather(
+                    *(
+                        client.request(
+                            "GET", f"students/{STUDENT_ID}/grades2/subjects/{i}"
+                        )
+                        for i in range(50)
+                    )
+                )
+        finally:
+            await server.stop()
+
+        assert len(responses) == 50
+        assert server.hits[LOGIN] == 1
+
+    asyncio.run(main())
+
+
+def test_token_statuses_are_shared_and_not_cached_as_responses():
+    async def main():
+        server = MockServer()
+        base_url = await server.start()
+        tokens = TokenStore()
+        try:
+            for _ in range(2):
+                async with ClassevivaClient(
+                    USERNAME,
+                    PASSWORD,
+                    base_url=base_url,
+                    cache_backend=MemoryBackend(),
+                    persist_tokens=False,
+                    token_store=tokens,
+                ) as client:
+                    usage = await client.cache_usage()
+        finally:
+            await server.stop()
+
+        assert server.hits[LOGIN] == 1
+        assert server.hits["/rest/v1/auth/status"] == 1
+        # only the responses, like the card, are cached
+        for level in usage.values():
+            assert "logins_status" not in level["families"]
+
+    asyncio.run(main())
+
+
+def test_password_is_hashed_once_per_token_store(monkeypatch):
+    hashed = []
+    original = bcrypt.hashpw
+
+    def hashpw(password: bytes, salt: bytes) -> bytes:
+        hashed.append(salt)
+        return original(password, salt)
+
+    monkeypatch.setattr("aiocvv._auth.bcrypt.hashpw", hashpw)
+
+    async def main():
+        server = MockServer()
+        base_url = await server.start()
+        backend = MemoryBackend()
+        tokens = TokenStore()
+        try:
+            for _ in range(3):
+                async with ClassevivaClient(
+                    USERNAME,
+                    PASSWORD,
+                    base_url=base_url,
+                    cache_backend=backend,
+                    token_store=tokens,
+                ):
+                    # the token is kept in memory, so it's looked up on disk again
+                    tokens.invalidate(TokenStore.key(base_url, USERNAME))
+        finally:
+            await server.stop()
+
+        assert len(hashed) == 1
+        assert server.hits[LOGIN] == 1
+
+    asyncio.run(main())
+
+
+def test_revoked_token_is_replaced_once():
+    async def main():
+        server = MockServer()
+        base_url = await server.start()
+        backend = MemoryBackend()
+        try:
+            async with client(base_url, backend) as first:
+                server.revoke_tokens()
+                server.reset_stats()
+                responses = await asyncio.gather(
+                    *(
+                        first.request(
+                            "GET", f"students/{STUDENT_ID}/grades2/subjects/{i}"
+                        )
+                        for i in range(20)
+                    )
+                )
+                assert server.hits[LOGIN] == 1
+
+            # the revoked token isn't restored from the cache either
+            server.reset_stats()
+            async with client(base_url, backend) as second:
+                await second.request("GET", f"students/{STUDENT_ID}/card")
+        finally:
+            await server.stop()
+
+        assert all(resp.status == 200 for resp in responses)
+        assert server.hits[LOGIN] == 0
+        assert server.statuses[401] == 0
+
+    asyncio.run(main())
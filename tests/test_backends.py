@@ -0,0 +1,289 @@
+"""
+Tests for the cache backends, and for the cache and the authentication
+going through a fake stand-in for a networked key-value store.
+"""
+
+import time
+import pickle
+import asyncio
+from typing import Any, Dict, Optional
+
+import pytest
+from diskcache import Cache
+
+from aiocvv import ClassevivaClient
+from aiocvv.backends import (
+    CacheBackend,
+    MemoryBackend,
+    DiskCacheBackend,
+    SQLiteBackend,
+)
+from aiocvv.cache import ResponseCache, request_key
+from aiocvv.response import Response
+
+from benchmarks.server import MockServer, USERNAME, PASSWORD
+
+LOGIN = "/rest/v1/auth/login"
+
+
+class NetworkBackend:
+    """
+    Stands in for a key-value store over the network: every operation
+    takes a round trip, and the values are serialized like they would be
+    on the wire. ``add`` is atomic on the server's side, like ``SETNX``.
+    """
+
+    def __init__(self, latency: float = 0.005):
+        self.latency = latency
+        self.calls: Dict[str, int] = {}
+        self.__data: Dict[str, bytes] = {}
+
+    async def __round_trip(self, operation: str):
+        self.calls[operation] = self.calls.get(operation, 0) + 1
+        await asyncio.sleep(self.latency)
+
+    async def get(self, key: str) -> Optional[Any]:
+        await self.__round_trip("get")
+        value = self.__data.get(key)
+        return pickle.loads(value) if value is not None else None
+
+    async def set(self, key: str, value: Any):
+        value = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        await self.__round_trip("set")
+        self.__data[key] = value
+
+    async def add(self, key: str, value: Any) -> bool:
+        value = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        await self.__round_trip("add")
+        if key in self.__data:
+            return False
+
+        self.__data[key] = value
+        return True
+
+    async def delete(self, key: str):
+        await self.__round_trip("delete")
+        self.__data.pop(key, None)
+
+    async def sizes(self) -> Dict[str, int]:
+        await self.__round_trip("sizes")
+        return {key: len(value) for key, value in self.__data.items()}
+
+    async def close(self):
+        pass
+
+
+def response(body: bytes = b'{"grades": []}') -> Response:
+    return Response(
+        time.time(),
+        body,
+        {"Content-Type": "application/json", "ETag": '"abc"'},
+        200,
+        "OK",
+    )
+
+
+def client(base_url: str, backend: CacheBackend) -> ClassevivaClient:
+    return ClassevivaClient(
+        USERNAME, PASSWORD, base_url=base_url, cache_backend=backend
+    )
+
+
+def test_network_backend_is_a_backend():
+    assert isinstance(NetworkBackend(), CacheBackend)
+
+
+def test_response_cache_through_network_backend():
+    async def main():
+        backend = NetworkBackend()
+        cache = ResponseCache(backend, maxsize=1)
+        first = request_key("GET", "https://example.com/students/1/grades2")
+        second = request_key("GET", "https://example.com/students/1/subjects")
+
+        await cache.set(first, response())
+        await cache.get(first)
+        # fresh responses are returned from memory
+        assert backend.calls.get("get", 0) == 0
+
+        await cache.set(second, response(b'{"subjects": []}'))
+        cached = await cache.get(first)
+        # the first one has been evicted, so it's read back from the backend
+        assert backend.calls["get"] == 1
+        assert cached.content == {"grades": []}
+        assert cached.etag == '"abc"'
+
+        cache.clear_memory()
+        assert cache.peek(second) is None
+        assert (await cache.get(second)).content == {"subjects": []}
+
+    asyncio.run(main())
+
+
+@pytest.mark.parametrize("eviction", ["lru", "lfu"])
+def test_response_cache_without_memory(eviction):
+    async def main():
+        backend = NetworkBackend()
+        cache = ResponseCache(backend, maxsize=0, eviction=eviction)
+        key = request_key("GET", "https://example.com/students/1/grades2")
+
+        await cache.set(key, response())
+        assert cache.peek(key) is None
+        assert (await cache.get(key)).content == {"grades": []}
+        assert (await cache.usage(backend=False))["memory"]["entries"] == 0
+
+    asyncio.run(main())
+
+
+def test_response_cache_rejects_negative_maxsize():
+    with pytest.raises(ValueError):
+        ResponseCache(MemoryBackend(), maxsize=-1)
+
+
+def test_usage_through_network_backend():
+    async def main():
+        cache = ResponseCache(NetworkBackend())
+        await cache.set(
+            request_key("GET", "https://example.com/students/1/grades2"), response()
+        )
+        await cache.backend.set("salt:https://example.com/", b"salt")
+
+        usage = await cache.usage()
+        assert usage["memory"]["entries"] == 1
+        assert usage["memory"]["families"] == {"students/grades2": len(response().body)}
+        assert usage["backend"]["entries"] == 2
+        assert set(usage["backend"]["families"]) == {"students/grades2", "salt"}
+        assert "backend" not in await cache.usage(backend=False)
+
+    asyncio.run(main())
+
+
+def test_logins_share_salt_and_token_through_network_backend():
+    async def main():
+        server = MockServer()
+        base_url = await server.start()
+        backend = NetworkBackend()
+        try:
+            # both clients race to store the salt, only one of them can
+            clients = [client(base_url, backend) for _ in range(2)]
+            await asyncio.gather(*(c.login() for c in clients))
+            for c in clients:
+                await c.close()
+
+            # so the token is looked up under the same key by every client
+            sizes = await backend.sizes()
+            assert len([key for key in sizes if key.startswith("salt:")]) == 1
+            assert len([key for key in sizes if key.startswith("logins:")]) == 1
+
+            server.reset_stats()
+            async with client(base_url, backend) as c:
+                assert c.metrics.snapshot()["logins"]["restored"] == 1
+
+            assert server.hits[LOGIN] == 0
+        finally:
+            await server.stop()
+
+    asyncio.run(main())
+
+
+BACKENDS = {
+    "memory": lambda path: MemoryBackend(),
+    "diskcache": lambda path: DiskCacheBackend(str(path / "diskcache")),
+    "sqlite": lambda path: SQLiteBackend(str(path / "cache.db")),
+    "network": lambda path: NetworkBackend(),
+}
+
+
+@pytest.mark.parametrize("name", BACKENDS)
+def test_backend_operations(name, tmp_path):
+    async def main():
+        backend = BACKENDS[name](tmp_path)
+        assert await backend.get("missing") is None
+
+        await backend.set("key", {"value": 1})
+        assert await backend.get("key") == {"value": 1}
+        await backend.set("key", {"value": 2})
+        assert await backend.get("key") == {"value": 2}
+
+        await backend.delete("key")
+        await backend.delete("key")
+        assert await backend.get("key") is None
+        await backend.close()
+
+    asyncio.run(main())
+
+
+@pytest.mark.parametrize("name", BACKENDS)
+def test_backend_add_is_atomic(name, tmp_path):
+    async def main():
+        backend = BACKENDS[name](tmp_path)
+        added = await asyncio.gather(*(backend.add("salt", i) for i in range(20)))
+        assert added.count(True) == 1
+        assert await backend.get("salt") == added.index(True)
+        assert not await backend.add("salt", -1)
+        await backend.close()
+
+    asyncio.run(main())
+
+
+@pytest.mark.parametrize("name", BACKENDS)
+def test_backend_sizes(name, tmp_path):
+    async def main():
+        backend = BACKENDS[name](tmp_path)
+        await backend.set("small", b"x")
+        await backend.set("large", b"x" * 100_000)
+
+        sizes = await backend.sizes()
+        assert set(sizes) == {"small", "large"}
+        assert 0 < sizes["small"] < sizes["large"]
+        assert sizes["large"] >= 100_000
+        await backend.close()
+
+    asyncio.run(main())
+
+
+def test_diskcache_sizes_without_its_table(tmp_path):
+    cache = Cache(str(tmp_path))
+    try:
+        cache.set("small", b"x")
+        cache.set("large", b"x" * 100_000)
+        cache.set("object", {"value": 1})
+        # pylint: disable-next=protected-access
+        sizes = DiskCacheBackend._DiskCacheBackend__read_sizes(cache)
+    finally:
+        cache.close()
+
+    assert set(sizes) == {"small", "large", "object"}
+    assert sizes["large"] == 100_000
+    assert 0 < sizes["small"] < sizes["large"]
+
+
+@pytest.mark.parametrize("name", BACKENDS)
+def test_backend_reopens_after_close(name, tmp_path):
+    async def main():
+        backend = BACKENDS[name](tmp_path)
+        await backend.set("key", "value")
+        await backend.close()
+
+        assert await backend.get("key") == "value"
+        await backend.set("other", "value")
+        assert set(await backend.sizes()) == {"key", "other"}
+        await backend.close()
+        await backend.close()
+
+    asyncio.run(main())
+
+
+@pytest.mark.parametrize("name", ["diskcache", "sqlite"])
+def test_backend_persists(name, tmp_path):
+    async def main():
+        backend = BACKENDS[name](tmp_path)
+        await backend.set("key", response())
+        await backend.close()
+
+        reopened = BACKENDS[name](tmp_path)
+        cached = await reopened.get("key")
+        await reopened.close()
+        assert cached.body == response().body
+        assert cached.content == {"grades": []}
+
+    asyncio.run(main())
@@ -0,0 +1,31 @@
+"""
+Tests for the calendar helpers, against the mock server in :mod:`benchmarks.server`.
+"""
+
+import asyncio
+
+from benchmarks.e2e import Runner, period_summary
+from benchmarks.server import MockServer
+
+
+def test_periods_reuse_their_partition():
+    async def main():
+        # nothing is ever fresh, so every request reaches the server
+        server = MockServer(max_age=0)
+        base_url = await server.start()
+        runner = Runner(server, base_url, 3)
+        try:
+            cold = await runner.run(period_summary, True, False)
+            warm = await runner.run(period_summary, True, True)
+            partition = server.hits["/rest/v1/students/{id}/grades2"]
+        finally:
+            await server.stop()
+
+        assert cold["failed"] == warm["failed"] == 0
+        # periods, then grades2, notes, absences and subjects once per client
+        assert cold["requests"] == 6 * 3
+        # only the periods
+        assert warm["requests"] == 1 * 3
+        assert partition == 3 + 1
+
+    asyncio.run(main())
@@ -0,0 +1,62 @@
+"""
+Tests for recording and replaying cassettes, against the mock server
+in :mod:`benchmarks.server`.
+"""
+
+import asyncio
+
+from aiocvv import ClassevivaClient
+from aiocvv.backends import MemoryBackend
+from aiocvv.cassette import Cassette, SCRUBBED
+
+from benchmarks.server import MockServer, USERNAME, PASSWORD
+
+LOGIN = "/rest/v1/auth/login"
+
+
+def client(base_url: str, backend: MemoryBackend, **kwargs) -> ClassevivaClient:
+    return ClassevivaClient(
+        USERNAME, PASSWORD, base_url=base_url, cache_backend=backend, **kwargs
+    )
+
+
+async def contents(backend: MemoryBackend) -> dict:
+    return {key: await backend.get(key) for key in await backend.sizes()}
+
+
+def test_replay_renews_tokens_and_leaves_live_cache_alone(tmp_path):
+    async def main():
+        server = MockServer(token_ttl=1)
+        base_url = await server.start()
+        path = str(tmp_path / "cassette.json")
+        live = MemoryBackend()
+        try:
+            async with client(
+                base_url, live, cassette=Cassette(path, "record")
+            ) as recorder:
+                await recorder.me.get_grades()
+
+            # the recorded token has expired by the time it's replayed
+            await asyncio.sleep(1.5)
+            before = await contents(live)
+            server.reset_stats()
+            async with client(base_url, live, cassette=Cassette(path)) as replayer:
+                for _ in range(20):
+                    await replayer.me.get_grades()
+
+                logins = replayer.metrics.snapshot()["logins"]
+
+            assert server.requests == 0
+            assert logins["succeeded"] == 1
+            assert await contents(live) == before
+
+            async with client(base_url, live) as after:
+                await after.me.get_grades()
+                assert after.metrics.snapshot()["logins"]["restored"] == 0
+        finally:
+            await server.stop()
+
+        assert server.hits[LOGIN] == 1
+        assert SCRUBBED not in repr(await contents(live))
+
+    asyncio.run(main())